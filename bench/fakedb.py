@@ -0,0 +1,572 @@
+#!/usr/bin/env python
+
+"""In-memory stand-in for a pymysql connection to information_schema.
+
+FakeConnection answers the queries built by the sgdb prep_query_
+functions from table metadata held in a FakeDatabase, with DictCursor
+style rows, so the sgdb functions and the code generators can be run
+without a MySQL or MariaDB server.  It is not an SQL engine: a SELECT is
+interpreted as a list of column names, an information_schema table, the
+`name = 'value'`, `name = number`, `name IN (...)` and `name NOT IN (...)`
+conditions of its WHERE clause, and an ORDER BY list.  Table aliases, like the `k.` of
+`k.TABLE_NAME`, are ignored, and a join is answered by the first table.
+
+The module also builds synthetic schemas of any size whose columns cover
+every branch of sgscripts.get_type_string_from_field(), and whose tables
+include composite primary keys, secondary indexes, partitioning, and
+foreign keys.
+"""
+
+import itertools
+import re
+import zlib
+
+re_select = re.compile(r"^\s*SELECT\s+(DISTINCT\s+)?(.*?)\s+FROM\s+information_schema\.(\w+)(.*)$",
+                       re.IGNORECASE | re.DOTALL)
+re_equals = re.compile(r"(\w+)\s*=\s*(?:'([^']*)'|(\d+)\b)")
+re_in = re.compile(r"(\w+)\s+(NOT\s+)?IN\s*\(([^)]*)\)", re.IGNORECASE)
+re_order = re.compile(r"ORDER\s+BY\s+([\w\s.,]+?)\s*$", re.IGNORECASE)
+re_alias = re.compile(r"^\w+\.")
+re_drop = re.compile(r"^\s*DROP\s+PROCEDURE\s+IF\s+EXISTS\s+(\S+)", re.IGNORECASE)
+re_create = re.compile(r"^\s*CREATE\s+(?:OR\s+REPLACE\s+)?PROCEDURE\s+(\S+)\s*\(.*?"
+                       r"(?:COMMENT\s+'([^']*)'\s*)?^(BEGIN\b.*)$",
+                       re.IGNORECASE | re.DOTALL | re.MULTILINE)
+
+
+class FakeError(Exception):
+    """Raised for statements FakeConnection can't interpret."""
+
+
+class FakeDatabase:
+    """Table and procedure metadata of the databases of a fake server.
+
+    `schemas` maps a database name to a dictionary with a `tables`
+    dictionary, table name -> table entry, and a `procedures`
+    dictionary, procedure name -> (definition, comment).  A table entry
+    holds the table's `columns`, a list of information_schema.COLUMNS
+    style dictionaries, its estimated `table_rows`, its `indexes`, its
+    `partitions`, and its `foreign_keys`, see add_table().
+    """
+    schemas = None
+
+    def __init__(self):
+        """Constructor, for a server without databases."""
+        self.schemas = {}
+
+    def get_schema(self, database):
+        """Return the entry of `database`, creating it if necessary."""
+        return self.schemas.setdefault(database, { "tables": {}, "procedures": {} })
+
+    def add_table(self, database, table, columns, table_rows=0, indexes=None,
+                  unique=(), partitions=None, foreign_keys=None, index_types=None):
+        """Add or replace a table.
+
+        Args:
+           database (string): name of the database
+           table (string):    name of the table
+           columns (list):    information_schema.COLUMNS style dictionaries
+           table_rows (integer, optional): estimated number of rows
+           indexes (dictionary, optional): index name -> column names of
+                              the secondary indexes.  The PRIMARY index is
+                              made of the columns whose COLUMN_KEY is PRI.
+           unique (iterable, optional): names of the unique `indexes`
+           partitions (dictionary, optional): the partitioning, as returned
+                              by sgdb.collect_table_partitions()
+           foreign_keys (list, optional): dictionaries of the constraint
+                              "name", the "columns", the "referenced_table",
+                              and its "referenced" columns
+           index_types (dictionary, optional): index name -> INDEX_TYPE of
+                              the indexes that aren't BTREE, like FULLTEXT
+        """
+        primary = [ column["COLUMN_NAME"] for column in columns if column["COLUMN_KEY"] == "PRI" ]
+        all_indexes = { "PRIMARY": primary } if primary else {}
+        all_indexes.update(indexes or {})
+
+        self.get_schema(database)["tables"][table] = {
+            "columns": columns,
+            "table_rows": table_rows,
+            "indexes": all_indexes,
+            "unique": { "PRIMARY", *unique },
+            "partitions": partitions,
+            "foreign_keys": foreign_keys or [],
+            "index_types": index_types or {} }
+
+    def add_procedure(self, database, name, definition="", comment=""):
+        """Add or replace a stored procedure."""
+        self.get_schema(database)["procedures"][name] = (definition, comment)
+
+    def drop_procedure(self, database, name):
+        """Remove a stored procedure if it exists."""
+        self.get_schema(database)["procedures"].pop(name, None)
+
+    def get_column_count(self):
+        """Return the number of columns in all tables of all databases."""
+        return sum(len(table["columns"])
+                   for schema in self.schemas.values()
+                   for table in schema["tables"].values())
+
+    def iter_schemata(self, _filters):
+        """Yield information_schema.SCHEMATA records."""
+        for database in self.schemas:
+            yield { "SCHEMA_NAME": database }
+
+    def iter_tables(self, filters):
+        """Yield information_schema.TABLES records."""
+        for database, table, entry in self.select_tables(filters):
+            yield { "TABLE_SCHEMA": database, "TABLE_NAME": table,
+                    "TABLE_TYPE": "BASE TABLE", "TABLE_ROWS": entry["table_rows"] }
+
+    def iter_columns(self, filters):
+        """Yield information_schema.COLUMNS records."""
+        for database, table, entry in self.select_tables(filters):
+            for position, column in enumerate(entry["columns"], 1):
+                record = { "TABLE_SCHEMA": database, "TABLE_NAME": table,
+                           "ORDINAL_POSITION": position }
+                record.update(column)
+                yield record
+
+    def iter_statistics(self, filters):
+        """Yield information_schema.STATISTICS records."""
+        for database, table, entry in self.select_tables(filters):
+            for index_name, column_names in entry["indexes"].items():
+                for position, column_name in enumerate(column_names, 1):
+                    yield { "TABLE_SCHEMA": database, "TABLE_NAME": table,
+                            "INDEX_NAME": index_name, "COLUMN_NAME": column_name,
+                            "SEQ_IN_INDEX": position,
+                            "NON_UNIQUE": 0 if index_name in entry["unique"] else 1,
+                            "INDEX_TYPE": entry["index_types"].get(index_name, "BTREE") }
+
+    def iter_partitions(self, filters):
+        """Yield an information_schema.PARTITIONS record of each partitioned
+        table, which stands for the records of all its partitions."""
+        for database, table, entry in self.select_tables(filters):
+            partitions = entry["partitions"]
+            if partitions:
+                yield { "TABLE_SCHEMA": database, "TABLE_NAME": table,
+                        "PARTITION_METHOD": partitions["method"],
+                        "PARTITION_EXPRESSION": partitions["expression"],
+                        "SUBPARTITION_METHOD": partitions.get("subpartition_method"),
+                        "SUBPARTITION_EXPRESSION": partitions.get("subpartition_expression") }
+
+    def iter_key_column_usage(self, filters):
+        """Yield information_schema.KEY_COLUMN_USAGE records of the foreign keys."""
+        for database, table, entry in self.select_tables(filters):
+            for key in entry["foreign_keys"]:
+                for position, (column_name, referenced) in enumerate(zip(key["columns"],
+                                                                         key["referenced"]), 1):
+                    yield { "TABLE_SCHEMA": database, "TABLE_NAME": table,
+                            "CONSTRAINT_NAME": key["name"], "COLUMN_NAME": column_name,
+                            "ORDINAL_POSITION": position,
+                            "REFERENCED_TABLE_SCHEMA": database,
+                            "REFERENCED_TABLE_NAME": key["referenced_table"],
+                            "REFERENCED_COLUMN_NAME": referenced }
+
+    def iter_routines(self, filters):
+        """Yield information_schema.ROUTINES records."""
+        databases = filters.get("ROUTINE_SCHEMA", self.schemas)
+        for database in databases:
+            schema = self.schemas.get(database)
+            if schema is not None:
+                for name, (definition, comment) in schema["procedures"].items():
+                    yield { "ROUTINE_SCHEMA": database, "ROUTINE_NAME": name,
+                            "ROUTINE_TYPE": "PROCEDURE",
+                            "ROUTINE_DEFINITION": definition,
+                            "ROUTINE_COMMENT": comment }
+
+    def select_tables(self, filters):
+        """Yield (database, table, entry) for the tables matching
+        the TABLE_SCHEMA and TABLE_NAME values of `filters`."""
+        databases = filters.get("TABLE_SCHEMA", self.schemas)
+        for database in databases:
+            schema = self.schemas.get(database)
+            if schema is None:
+                continue
+
+            tables = schema["tables"]
+            names = filters.get("TABLE_NAME")
+            if names is None:
+                names = tables
+
+            for table in names:
+                entry = tables.get(table)
+                if entry is not None:
+                    yield database, table, entry
+
+
+def get_checksum(records):
+    """Return the count and the CRC32 checksum of the `|`-joined values of
+    `records`, as the server computes a part of a table signature."""
+    checksum = 0
+    count = 0
+    for values in records:
+        text = "|".join(str(value) for value in values if value is not None)
+        checksum ^= zlib.crc32(text.encode("utf-8"))
+        count += 1
+
+    return f"{count}:{checksum}"
+
+def get_table_signature(tables, table):
+    """Compute the signature of `table`, one of the `tables` of a schema,
+    the way sgdb.prep_query_table_signatures() has the server compute it."""
+    entry = tables[table]
+    columns = get_checksum((position, column["COLUMN_NAME"], column["COLUMN_TYPE"],
+                            column["IS_NULLABLE"], column["COLUMN_KEY"], column["EXTRA"])
+                           for position, column in enumerate(entry["columns"], 1))
+    indexes = get_checksum((index_name, position, column_name,
+                            0 if index_name in entry["unique"] else 1,
+                            entry["index_types"].get(index_name, "BTREE"))
+                           for index_name, column_names in entry["indexes"].items()
+                           for position, column_name in enumerate(column_names, 1))
+
+    partitions = entry["partitions"]
+    partitioning = "0"
+    if partitions:
+        values = (partitions["method"], partitions["expression"],
+                  partitions.get("subpartition_method"), partitions.get("subpartition_expression"))
+        text = "|".join(str(value) for value in values if value is not None)
+        partitioning = str(zlib.crc32(text.encode("utf-8")))
+
+    referring = get_checksum((child, key["name"], position, column_name, referenced)
+                             for child, child_entry in tables.items()
+                             for key in child_entry["foreign_keys"]
+                             if key["referenced_table"] == table
+                             for position, (column_name, referenced)
+                             in enumerate(zip(key["columns"], key["referenced"]), 1))
+
+    return f"{columns}/{indexes}/{partitioning}/{referring}"
+
+def parse_filters(where):
+    """Collect the `name = 'value'` and `name IN (...)` conditions of a
+    WHERE clause into a dictionary of name -> list of values, and the
+    `name NOT IN (...)` conditions into a dictionary of excluded values.
+
+    Returns:
+       (tuple): the filters and the exclusions
+    """
+    filters = {}
+    exclusions = {}
+    for name, value, number in re_equals.findall(where):
+        filters[name.upper()] = [ value or number ]
+
+    for name, negated, values in re_in.findall(where):
+        target = exclusions if negated else filters
+        target[name.upper()] = [ value.strip().strip("'") for value in values.split(",") ]
+
+    return filters, exclusions
+
+
+class FakeCursor:
+    """DictCursor work-alike whose queries are answered by a FakeConnection."""
+    connection = None
+    rows = None
+    position = 0
+    rowcount = -1
+
+    def __init__(self, connection):
+        """Constructor."""
+        self.connection = connection
+        self.rows = []
+
+    def __enter__(self):
+        """Allows the cursor to be used in a `with` statement."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the cursor at the end of a `with` statement."""
+        self.close()
+
+    def __iter__(self):
+        """Iterate over the unread rows."""
+        return iter(self.fetchone, None)
+
+    def close(self):
+        """Discard unread rows."""
+        self.rows = []
+        self.position = 0
+
+    def execute(self, query, args=None):
+        """Execute a statement, returning the number of result rows."""
+        if args is not None:
+            raise FakeError("FakeCursor doesn't support query arguments")
+
+        self.rows = self.connection.run_statement(query)
+        self.position = 0
+        self.rowcount = len(self.rows)
+        return self.rowcount
+
+    def fetchone(self):
+        """Return the next row, or None."""
+        if self.position >= len(self.rows):
+            return None
+
+        self.position += 1
+        return self.rows[self.position - 1]
+
+    def fetchmany(self, size=1):
+        """Return a list of up to `size` rows."""
+        rows = self.rows[self.position:self.position + size]
+        self.position += len(rows)
+        return rows
+
+    def fetchall(self):
+        """Return the remaining rows."""
+        rows = self.rows[self.position:]
+        self.position = len(self.rows)
+        return rows
+
+
+class FakeSSCursor(FakeCursor):
+    """SSDictCursor work-alike that produces the rows of a SELECT as they are read.
+
+    The rows are not sorted by the ORDER BY clause, but come in the order
+    of the FakeDatabase, which is the table name order for the databases
+    built by make_database().
+    """
+    def close(self):
+        """Discard unread rows."""
+        self.rows = iter(())
+
+    def execute(self, query, args=None):
+        """Execute a statement, returning 0 as the number of rows is not known."""
+        if args is not None:
+            raise FakeError("FakeSSCursor doesn't support query arguments")
+
+        self.rows = self.connection.run_statement(query, buffered=False)
+        self.rowcount = 0
+        return 0
+
+    def fetchone(self):
+        """Return the next row, or None."""
+        return next(self.rows, None)
+
+    def fetchmany(self, size=1):
+        """Return a list of up to `size` rows."""
+        return list(itertools.islice(self.rows, size))
+
+    def fetchall(self):
+        """Return the remaining rows."""
+        return list(self.rows)
+
+
+class FakeConnection:
+    """pymysql connection work-alike, see the module description.
+
+    The `queries` and `rows` counters report how many statements were
+    executed and how many rows they returned.
+    """
+    database = None
+    current_db = None
+    queries = 0
+    rows = 0
+
+    def __init__(self, database, current_db="information_schema"):
+        """Constructor.
+
+        Args:
+           database (object):     FakeDatabase whose metadata will be queried
+           current_db (string, optional): initial default database
+        """
+        self.database = database
+        self.current_db = current_db
+
+    def cursor(self, cursor=None):
+        """Return a new cursor, a FakeCursor unless `cursor` is a FakeCursor class."""
+        if isinstance(cursor, type) and issubclass(cursor, FakeCursor):
+            return cursor(self)
+        return FakeCursor(self)
+
+    def select_db(self, db):
+        """Change the default database."""
+        self.current_db = db
+
+    def ping(self, reconnect=False):   #pylint: disable=unused-argument
+        """The connection is always alive."""
+
+    def close(self):
+        """Nothing to release."""
+
+    def run_statement(self, query, buffered=True):
+        """Run a statement and return its result rows as a list of dictionaries,
+        or if not `buffered`, an iterator of the unsorted rows of a SELECT."""
+        self.queries += 1
+
+        match = re_select.match(query)
+        if match is None:
+            rows = self.run_procedure_statement(query)
+        elif not buffered:
+            return self.count_rows(self.run_select(*match.groups(), ordered=False))
+        else:
+            rows = self.run_select(*match.groups())
+
+        self.rows += len(rows)
+        return rows
+
+    def count_rows(self, rows):
+        """Yield `rows`, counting them as they are read."""
+        for row in rows:
+            self.rows += 1
+            yield row
+
+    def run_select(self, distinct, select_list, source, rest, ordered=True):
+        """Answer a SELECT from information_schema table `source`, returning
+        a list, or if not `ordered`, an iterator of the unsorted rows.  The
+        records yielded by the FakeDatabase are already distinct."""
+        #pylint: disable=unused-argument,too-many-arguments
+        filters, exclusions = parse_filters(rest)
+        iterate = getattr(self.database, "iter_" + source.lower(), None)
+        if iterate is None:
+            raise FakeError(f"Unsupported table information_schema.{source}")
+
+        if "AS SIGNATURE" in select_list.upper():
+            return [ { "TABLE_NAME": table, "TABLE_ROWS": entry["table_rows"],
+                       "SIGNATURE": get_table_signature(self.database.schemas[database]["tables"],
+                                                        table) }
+                     for database, table, entry in self.database.select_tables(filters) ]
+
+        names = [ re_alias.sub("", name.strip()) for name in select_list.split(",") ]
+        records = iterate(filters)
+
+        for name, values in filters.items():
+            if name not in ("TABLE_SCHEMA", "TABLE_NAME", "ROUTINE_SCHEMA"):
+                records = [ record for record in records if str(record.get(name)) in values ]
+
+        for name, values in exclusions.items():
+            records = [ record for record in records if str(record.get(name)) not in values ]
+
+        if not ordered:
+            return ( { name: record[name] for name in names } for record in records )
+
+        order = re_order.search(rest)
+        if order:
+            keys = [ re_alias.sub("", key.strip()) for key in order.group(1).split(",") ]
+            records = sorted(records, key=lambda record: [ record[key] for key in keys ])
+
+        return [ { name: record[name] for name in names } for record in records ]
+
+    def run_procedure_statement(self, query):
+        """Apply a DROP PROCEDURE or CREATE PROCEDURE statement to the current database."""
+        match = re_drop.match(query)
+        if match:
+            self.database.drop_procedure(self.current_db, match.group(1))
+            return []
+
+        match = re_create.match(query)
+        if match:
+            name, comment, body = match.groups()
+            self.database.add_procedure(self.current_db, name, body, comment or "")
+            return []
+
+        raise FakeError(f"Unsupported statement: {query.strip().splitlines()[0]}")
+
+
+def make_column(name, data_type, column_type=None, char_max_len=None, precision=None,
+                scale=None, nullable=True, key="", extra=""):
+    """Return an information_schema.COLUMNS style column dictionary."""
+    return { "COLUMN_NAME": name,
+             "DATA_TYPE": data_type,
+             "CHARACTER_MAXIMUM_LENGTH": char_max_len,
+             "NUMERIC_PRECISION": precision,
+             "NUMERIC_SCALE": scale,
+             "IS_NULLABLE": "YES" if nullable else "NO",
+             "COLUMN_KEY": key,
+             "COLUMN_TYPE": column_type or data_type,
+             "EXTRA": extra }
+
+# Column prototypes for synthetic tables, (name stem, make_column() arguments),
+# covering each branch of sgscripts.get_type_string_from_field(): signed and
+# unsigned integers, CHAR types, NUMERIC and DECIMAL, ENUM, SET, and types
+# that are used as they are.
+column_prototypes = [
+    ("count", dict(data_type="int", column_type="int(11)", precision=10, scale=0)),
+    ("flags", dict(data_type="tinyint", column_type="tinyint(3) unsigned",
+                   precision=3, scale=0)),
+    ("name", dict(data_type="varchar", column_type="varchar(80)", char_max_len=80)),
+    ("code", dict(data_type="char", column_type="char(6)", char_max_len=6)),
+    ("amount", dict(data_type="decimal", column_type="decimal(10,2)", precision=10, scale=2)),
+    ("ratio", dict(data_type="numeric", column_type="decimal(12,6)", precision=12, scale=6)),
+    ("status", dict(data_type="enum", column_type="enum('new','active','retired')",
+                    char_max_len=7)),
+    ("tags", dict(data_type="set", column_type="set('red','green','blue','yellow')",
+                  char_max_len=21)),
+    ("created", dict(data_type="datetime")),
+    ("total", dict(data_type="bigint", column_type="bigint(20) unsigned",
+                   precision=20, scale=0)),
+    ("notes", dict(data_type="text", char_max_len=65535)),
+    ("weight", dict(data_type="double", precision=22)),
+    ("born", dict(data_type="date")),
+    ("description_of_the_value", dict(data_type="mediumtext", char_max_len=16777215)),
+    ("rank", dict(data_type="smallint", column_type="smallint(6)", precision=5, scale=0)),
+    ("photo", dict(data_type="blob", char_max_len=65535)),
+]
+
+def make_table_columns(column_count, composite=False):
+    """Return the columns of a synthetic table.
+
+    The first column is an auto-increment primary key, followed by a
+    `part_id` column that completes the key of a `composite` table.  The
+    others cycle through `column_prototypes`, every third one being NOT NULL.
+    """
+    columns = [ make_column("id", "int", column_type="int(10) unsigned", precision=10,
+                            scale=0, nullable=False, key="PRI", extra="auto_increment") ]
+    if composite:
+        columns.append(make_column("part_id", "smallint", column_type="smallint(5) unsigned",
+                                   precision=5, scale=0, nullable=False, key="PRI"))
+
+    for index in range(len(columns), column_count):
+        stem, kwargs = column_prototypes[(index - 1) % len(column_prototypes)]
+        columns.append(make_column(f"{stem}_{index}", nullable=index % 3 != 0, **kwargs))
+
+    return columns
+
+def make_table_layout(number, column_names):
+    """Return the add_table() keyword arguments of the indexes, partitioning,
+    and foreign keys of synthetic table `number`, with columns `column_names`.
+
+    Every fourth table has a composite primary key and is partitioned by
+    HASH of its second key column, and every fourth table, offset by two,
+    is partitioned by KEY() of its primary key.  The first non-key column
+    is indexed, and in a table following a table with a single-column
+    key, it refers to that table's key.
+    """
+    layout = {}
+    if number % 4 == 0:
+        layout["partitions"] = { "method": "HASH", "expression": "`part_id`" }
+    elif number % 4 == 2:
+        layout["partitions"] = { "method": "KEY", "expression": "" }
+
+    key_columns = 2 if number % 4 == 0 else 1
+    if len(column_names) > key_columns:
+        column_name = column_names[key_columns]
+        layout["indexes"] = { f"ix_{column_name}": [ column_name ] }
+        if number > 1 and (number - 1) % 4 != 0:
+            layout["foreign_keys"] = [ { "name": f"fk_{number}_{column_name}",
+                                         "columns": [ column_name ],
+                                         "referenced_table": None,
+                                         "referenced": [ "id" ] } ]
+
+    return layout
+
+def make_database(table_count, column_count, database="bench"):
+    """Return a FakeDatabase with one database of synthetic tables,
+    see make_table_layout().
+
+    Args:
+       table_count (integer):  number of tables
+       column_count (integer): number of columns per table, including the primary key
+       database (string, optional): name of the database
+
+    Returns:
+       (object): FakeDatabase
+    """
+    fake = FakeDatabase()
+    width = len(str(table_count))
+    for number in range(1, table_count + 1):
+        columns = make_table_columns(column_count, composite=number % 4 == 0)
+        layout = make_table_layout(number, [ column["COLUMN_NAME"] for column in columns ])
+        for key in layout.get("foreign_keys", []):
+            key["referenced_table"] = f"Table{number - 1:0{width}}"
+
+        fake.add_table(database, f"Table{number:0{width}}", columns, table_rows=number * 10,
+                       **layout)
+
+    return fake
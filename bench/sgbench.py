@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+
+"""Throughput and memory benchmark of schema introspection and code generation.
+
+For each scale, given as TABLESxCOLUMNS, the benchmark builds a synthetic
+schema in a fakedb.FakeDatabase, then times two phases:
+
+   introspect  sgdb.collect_database_columns() through a FakeConnection,
+               and the table details, like the indexes and partitioning,
+               that the generated procedure kinds use
+   generate    every procedure of every table with SGScripter and
+               CurbedPrinter, as `schemagen -T -s all` would, or of the
+               --script kind
+
+The synthetic tables include composite primary keys, secondary indexes,
+partitioned tables, and foreign keys, see fakedb.make_table_layout(), so
+`--script index` or `--script fetch` exercise those paths too.
+
+Each phase is run --repeat times and the fastest run is reported.  A
+separate run under tracemalloc measures the peak memory of the two
+phases, excluding the synthetic schema itself.
+
+With --stream, the columns are read with sgdb.iter_database_columns()
+through an unbuffered fakedb.FakeSSCursor and each table is generated as
+its columns arrive, as `schemagen -T -s all --stream` would.  The two
+phases then overlap and are reported together as generate time, while
+the peak memory stays flat as the number of tables grows.
+
+The results can be saved with --json and compared with a saved run with
+--compare, which fails if the column throughput of a scale dropped by
+more than --tolerance, so the benchmark can track performance across
+releases without a live server.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+bench_path = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(bench_path), "schemagen.d"))
+
+# The imports follow the sys.path change:
+#pylint: disable=wrong-import-position,import-error
+import fakedb
+import sgdb
+import sgtables
+import sgtemplates
+#pylint: enable=wrong-import-position,import-error
+
+default_scales = [ "10x5", "100x20", "1000x20", "10000x5", "10x1000", "100x1000" ]
+
+script_options = { "script": "all",
+                   "confirm_fields": None,
+                   "indent_chars": 4,
+                   "delimiter": "$$",
+                   "max_chars": 80,
+                   "items_per_line": -1 }
+
+
+def parse_scale(scale):
+    """Convert a TABLESxCOLUMNS string to a (tables, columns) tuple."""
+    try:
+        tables, columns = scale.lower().split("x")
+        return int(tables), int(columns)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"invalid scale '{scale}', "
+                                         "expected TABLESxCOLUMNS") from err
+
+def read_details(conn, database, options):
+    """Read the table details that the requested procedure kinds use, as
+    schemagen's read_table_details() does.
+
+    Returns:
+       (dictionary): table name -> dictionary of details
+    """
+    details = {}
+    for name, function_name in sgtables.get_needed_details(options):
+        for table, value in getattr(sgdb, function_name)(conn, database).items():
+            details.setdefault(table, {})[name] = value
+
+    return details
+
+def introspect(conn, database, options, stream=False):
+    """Collect the details and the columns of every table in `database`,
+    or with `stream`, the details and an iterator that reads the columns
+    one table at a time.
+
+    Returns:
+       (tuple): iterator of (table, columns) tuples, and the table details
+    """
+    details = read_details(conn, database, options)
+    if stream:
+        return sgdb.iter_database_columns(conn, database,
+                                          cursorclass=fakedb.FakeSSCursor), details
+
+    return sgdb.collect_database_columns(conn, database).items(), details
+
+def generate(tables_columns, details, options):
+    """Generate the scripts of every table, returning the output size in characters."""
+    table_jobs = ( (table, columns, f"App_{table}_")
+                   for table, columns in tables_columns )
+
+    size = 0
+    for _, text, _ in sgtables.render_table_scripts(table_jobs, options, details=details):
+        size += len(text)
+
+    return size
+
+def run_scale(table_count, column_count, repeat, stream=False, script="all"):
+    """Benchmark a single scale.
+
+    Returns:
+       (dictionary): results of the scale
+    """
+    fake = fakedb.make_database(table_count, column_count)
+    conn = fakedb.FakeConnection(fake)
+    options = dict(script_options, script=script)
+
+    introspect_time = None
+    generate_time = None
+    size = 0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tables_columns, details = introspect(conn, "bench", options, stream)
+        elapsed = time.perf_counter() - start
+        introspect_time = elapsed if introspect_time is None else min(introspect_time, elapsed)
+
+        start = time.perf_counter()
+        size = generate(tables_columns, details, options)
+        elapsed = time.perf_counter() - start
+        generate_time = elapsed if generate_time is None else min(generate_time, elapsed)
+
+        del tables_columns, details
+
+    tracemalloc.start()
+    generate(*introspect(conn, "bench", options, stream), options)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total_columns = table_count * column_count
+    total_time = introspect_time + generate_time
+
+    return { "scale": f"{table_count}x{column_count}",
+             "tables": table_count,
+             "columns": total_columns,
+             "introspect_ms": introspect_time * 1000,
+             "generate_ms": generate_time * 1000,
+             "tables_per_sec": table_count / total_time,
+             "columns_per_sec": total_columns / total_time,
+             "output_mb_per_sec": size / generate_time / 1e6,
+             "output_chars": size,
+             "peak_mb": peak / 1e6 }
+
+def print_results(results):
+    """Print a table of benchmark results."""
+    print(f"{'scale':>10} {'introspect ms':>14} {'generate ms':>12} {'tables/s':>10} "
+          f"{'columns/s':>11} {'out MB/s':>9} {'peak MB':>9}")
+    for result in results:
+        print(f"{result['scale']:>10} {result['introspect_ms']:>14.1f} "
+              f"{result['generate_ms']:>12.1f} {result['tables_per_sec']:>10.0f} "
+              f"{result['columns_per_sec']:>11.0f} {result['output_mb_per_sec']:>9.2f} "
+              f"{result['peak_mb']:>9.1f}")
+
+def compare_results(results, baseline_path, tolerance):
+    """Return failure messages for scales slower than the saved baseline."""
+    with open(baseline_path, mode="rt", encoding="utf-8") as basefile:
+        baseline = { result["scale"]: result for result in json.load(basefile)["results"] }
+
+    failures = []
+    for result in results:
+        base = baseline.get(result["scale"])
+        if base is not None:
+            ratio = result["columns_per_sec"] / base["columns_per_sec"]
+            if ratio < 1 - tolerance:
+                failures.append(f"{result['scale']} ran at {ratio:.0%} of the baseline "
+                                "column throughput")
+
+    return failures
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description="schemagen throughput benchmark")
+    parser.add_argument("scales", nargs="*", type=parse_scale, metavar="TABLESxCOLUMNS",
+                        help="scales to run, default " + " ".join(default_scales))
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="number of timed runs of each scale")
+    parser.add_argument("-s", "--script", default="all",
+                        choices=[ "all" ] + sgtemplates.get_kind_names(),
+                        help="procedure kind to generate, default all")
+    parser.add_argument("--stream", action="store_true",
+                        help="read the columns with an unbuffered cursor while generating")
+    parser.add_argument("--json", metavar="FILE",
+                        help="save the results to FILE")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="fail if slower than the results saved in FILE")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="fraction of the baseline throughput that may be lost, default 0.2")
+    args = parser.parse_args()
+
+    scales = args.scales or [ parse_scale(scale) for scale in default_scales ]
+
+    results = []
+    for table_count, column_count in scales:
+        results.append(run_scale(table_count, column_count, max(1, args.repeat),
+                                 args.stream, args.script))
+
+    print_results(results)
+
+    if args.json:
+        with open(args.json, mode="wt", encoding="utf-8") as jsonfile:
+            json.dump({ "python": sys.version.split()[0], "results": results }, jsonfile,
+                      indent=1)
+
+    failures = []
+    if args.compare:
+        failures = compare_results(results, args.compare, args.tolerance)
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
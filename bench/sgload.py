@@ -0,0 +1,480 @@
+#!/usr/bin/env python
+
+"""Call-throughput load test of generated procedures on a live server.
+
+The load test works on a table of a scratch database, like the
+`run_test` database made from test_contents.sql:
+
+   seed     the table gets --rows synthetic rows, made from the column
+            metadata of sgdb.collect_table_columns() and written with
+            multi-row INSERT statements of --batch rows
+   deploy   the procedures of the --kinds are generated and created in
+            the database, named with the Load_ prefix so they don't
+            replace the application's procedures
+   call     each procedure is called --calls times, spread over
+            --connections connections calling at the same time
+
+The calls/sec and latency percentiles of each procedure are reported.
+Key parameters get the keys of existing rows, and other parameters
+synthetic values of their column's type.  Delete procedures take the
+keys of the rows added by the Add calls first, then those of seeded
+rows.  The load procedures are dropped afterwards unless --keep is set,
+but the seeded and added rows are left in the table.
+
+pymysql must be installed, as for schemagen.
+"""
+
+import argparse
+import collections
+import datetime
+import json
+import os
+import random
+import string
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+bench_path = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(bench_path), "schemagen.d"))
+
+# The imports follow the sys.path change:
+#pylint: disable=wrong-import-position,import-error
+import sgdb
+import sgdeploy
+import sgexplain
+import sgtables
+from sgmodel import TableModel
+#pylint: enable=wrong-import-position,import-error
+
+default_kinds = "list,add,read,update,delete"
+
+script_options = { "script": None,
+                   "confirm_fields": None,
+                   "indent_chars": 4,
+                   "delimiter": "$$",
+                   "max_chars": 80,
+                   "items_per_line": -1,
+                   "templates": None,
+                   "list_include": None,
+                   "list_exclude": None }
+
+# Largest synthetic value of the integer types, kept small enough for
+# signed columns:
+integer_limits = { "tinyint": 127, "smallint": 32767, "mediumint": 8388607,
+                   "int": 1000000, "integer": 1000000, "bigint": 1000000 }
+
+# Number of existing keys read for the key parameters:
+key_sample_limit = 100000
+
+percentiles = [ 50, 95, 99 ]
+
+
+class Procedure:
+    """A deployed procedure of the load test."""
+    kind = None
+    name = None
+    parameters = None
+
+    def __init__(self, kind, name, parameters):
+        """Constructor.
+
+        Args:
+           kind (string):     procedure kind, like "list"
+           name (string):     name of the procedure
+           parameters (list): (name, type) tuples from sgexplain.split_parameters()
+        """
+        self.kind = kind
+        self.name = name
+        self.parameters = parameters
+
+
+def make_value(column, rng, serial):
+    """Return a synthetic value for a column.
+
+    Args:
+       column (object):  sgmodel.Column
+       rng (object):     random.Random
+       serial (integer): number of the row, which makes the values of
+                         non-autonumber key columns distinct
+
+    Returns:
+       a value to pass as a query parameter
+    """
+    data_type = column["DATA_TYPE"].lower()
+
+    if data_type in integer_limits:
+        if column.is_primary:
+            return serial
+        return rng.randint(0, integer_limits[data_type])
+    if data_type in ("decimal", "numeric"):
+        digits = (column["NUMERIC_PRECISION"] or 10) - (column["NUMERIC_SCALE"] or 0)
+        return round(rng.uniform(0, 10 ** min(digits, 6) - 1), column["NUMERIC_SCALE"] or 0)
+    if data_type in ("float", "double", "real"):
+        return rng.uniform(0, 1000)
+    if data_type in ("bit", "bool", "boolean"):
+        return rng.randint(0, 1)
+    if data_type == "year":
+        return rng.randint(1970, 2100)
+    if data_type == "date":
+        return datetime.date(2000, 1, 1) + datetime.timedelta(days=rng.randrange(10000))
+    if data_type in ("datetime", "timestamp"):
+        return datetime.datetime(2000, 1, 1) + datetime.timedelta(seconds=rng.randrange(10 ** 9))
+    if data_type == "time":
+        return datetime.timedelta(seconds=rng.randrange(86400))
+    if data_type in ("enum", "set"):
+        choices = sgexplain.re_quoted.findall(column["COLUMN_TYPE"])
+        if data_type == "set":
+            return ",".join(rng.sample(choices, rng.randint(0, len(choices))))
+        return rng.choice(choices)
+    if data_type == "json":
+        return json.dumps({ "serial": serial, "value": rng.random() })
+    if data_type.endswith("blob") or data_type.endswith("binary"):
+        return rng.randbytes(min(column["CHARACTER_MAXIMUM_LENGTH"] or 64, 64))
+
+    # Character types, with the serial number making key values distinct:
+    length = min(column["CHARACTER_MAXIMUM_LENGTH"] or 200, 200)
+    text = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, length)))
+    if column.is_primary:
+        text = f"{serial}-{text}"
+    return text[:length]
+
+def get_serial_base(conn, model):
+    """Return the first serial number of new rows, following the values
+    of a numeric primary key."""
+    key = model.primary_key
+    if key is None or key.is_auto_increment or key["DATA_TYPE"].lower() not in integer_limits:
+        return 1
+
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT COALESCE(MAX({key.name}), 0) + 1 AS base FROM {model.name}")
+        return int(cur.fetchall()[0]["base"])
+
+def seed_table(conn, model, rows, batch, rng):
+    """Insert synthetic rows with multi-row INSERT statements.
+
+    Args:
+       conn (object):    open mysql connection using the table's database
+       model (object):   sgmodel.TableModel of the table
+       rows (integer):   number of rows to insert
+       batch (integer):  number of rows in each INSERT statement
+       rng (object):     random.Random
+
+    Returns:
+       None
+    """
+    columns = [ column for column in model.columns if not column.is_auto_increment ]
+    names = ", ".join(column.name for column in columns)
+    row_marks = "(" + ", ".join([ "%s" ] * len(columns)) + ")"
+    serial = get_serial_base(conn, model)
+
+    for start in range(0, rows, batch):
+        count = min(batch, rows - start)
+        values = []
+        for number in range(serial + start, serial + start + count):
+            values.extend(make_value(column, rng, number) for column in columns)
+
+        with conn.cursor() as cur:
+            cur.execute(f"INSERT INTO {model.name} ({names}) VALUES "
+                        + ", ".join([ row_marks ] * count), values)
+
+def read_keys(conn, model):
+    """Return the primary key values of up to `key_sample_limit` rows, as tuples."""
+    if len(model.primary_keys) == 0:
+        return []
+
+    names = [ column.name for column in model.primary_keys ]
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT {', '.join(names)} FROM {model.name} LIMIT {key_sample_limit}")
+        return [ tuple(row[name] for name in names) for row in cur.fetchall() ]
+
+def read_details(conn, database, table, kinds):
+    """Return the details of a table that the procedure kinds use, always
+    including its indexes, which order the primary key columns.
+
+    Returns:
+       (dictionary): see sgtables.print_table_script()
+    """
+    needed = [ ("indexes", "collect_table_indexes") ]
+    for kind in kinds:
+        for detail in sgtables.get_needed_details(dict(script_options, script=kind)):
+            if detail not in needed:
+                needed.append(detail)
+
+    details = {}
+    for name, function_name in needed:
+        collected = getattr(sgdb, function_name)(conn, database, [ table ])
+        if table in collected:
+            details[name] = collected[table]
+
+    return details
+
+def render_procedures(table, columns, details, kinds, prefix):
+    """Generate the procedures of the load test.
+
+    Args:
+       table (string):      name of the table
+       columns (list):      column dictionaries of the table
+       details (dictionary): table details, see sgtables.print_table_script()
+       kinds (list):        procedure kinds
+       prefix (string):     prefix of the procedure names
+
+    Returns:
+       (tuple): Procedure objects, in the order of `kinds`, and the
+                generated scripts
+    """
+    procedures = []
+    texts = []
+    for kind in kinds:
+        options = dict(script_options, script=kind)
+        text, _ = sgtables.render_table_script(table, columns, prefix, options, details=details)
+        texts.append(text)
+
+        for statement in sgdeploy.split_statements(text, options["delimiter"]):
+            parts = sgdeploy.split_create_statement(statement)
+            if parts is not None:
+                procedures.append(Procedure(kind, parts[0],
+                                            sgexplain.split_parameters(parts[1])))
+
+    return procedures, texts
+
+def make_arguments(procedure, model, key, rng, serial):
+    """Return the arguments of a call.
+
+    Args:
+       procedure (object): the Procedure
+       model (object):     sgmodel.TableModel of the table
+       key (tuple):        primary key values of the row to use
+       rng (object):       random.Random
+       serial (integer):   serial number for synthetic key values
+
+    Returns:
+       (list): argument values, None for parameters that aren't columns
+    """
+    arguments = []
+    for name, _ in procedure.parameters:
+        column = model.get_column(name)
+        if column is None:
+            arguments.append(None)
+        elif column.is_primary and key is not None:
+            arguments.append(key[model.primary_keys.index(column)])
+        else:
+            arguments.append(make_value(column, rng, serial))
+
+    return arguments
+
+def run_calls(conn, procedure, model, count, keys, delete_keys, added, seed):
+    """Call a procedure `count` times over a connection.
+
+    Args:
+       conn (object):       open mysql connection using the table's database
+       procedure (object):  the Procedure
+       model (object):      sgmodel.TableModel of the table
+       count (integer):     number of calls
+       keys (list):         existing key tuples
+       delete_keys (object): deque of key tuples for Delete calls
+       added (list):        key tuples of the rows returned by Add calls,
+                            to which the new keys are appended
+       seed (integer):      seed of the connection's random values
+
+    Returns:
+       (tuple): list of call latencies in seconds, number of failed calls,
+                and the first error message
+    """
+    rng = random.Random(seed)
+    query = f"CALL {procedure.name}({', '.join([ '%s' ] * len(procedure.parameters))})"
+    key_names = [ column.name for column in model.primary_keys ]
+
+    latencies = []
+    errors = 0
+    first_error = None
+
+    for number in range(count):
+        if procedure.kind == "delete":
+            try:
+                key = delete_keys.popleft()
+            except IndexError:
+                break
+        else:
+            key = rng.choice(keys) if keys else None
+
+        arguments = make_arguments(procedure, model, key, rng, seed * count + number)
+
+        start = time.perf_counter()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(query, arguments)
+                rows = cur.fetchall()
+                while cur.nextset():
+                    pass
+        except Exception as err:   #pylint: disable=broad-except
+            errors += 1
+            first_error = first_error or str(err)
+            continue
+
+        latencies.append(time.perf_counter() - start)
+
+        if procedure.kind == "add" and rows and all(name in rows[0] for name in key_names):
+            added.append(tuple(rows[0][name] for name in key_names))
+
+    return latencies, errors, first_error
+
+def get_percentile(ordered, percent):
+    """Return the nearest-rank percentile of a sorted list."""
+    if len(ordered) == 0:
+        return 0.0
+
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+def load_procedure(connections, procedure, model, calls, keys, delete_keys, added, seed):
+    """Call a procedure from every connection at the same time.
+
+    Returns:
+       (dictionary): results of the procedure, latencies in milliseconds
+    """
+    share, extra = divmod(calls, len(connections))
+    counts = [ share + (1 if number < extra else 0) for number in range(len(connections)) ]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+        outcomes = list(executor.map(
+            lambda number: run_calls(connections[number], procedure, model, counts[number],
+                                     keys, delete_keys, added, seed + number),
+            range(len(connections))))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for outcome in outcomes for latency in outcome[0])
+    errors = sum(outcome[1] for outcome in outcomes)
+    first_error = next((outcome[2] for outcome in outcomes if outcome[2]), None)
+
+    result = { "procedure": procedure.name,
+               "kind": procedure.kind,
+               "calls": len(latencies),
+               "errors": errors,
+               "error": first_error,
+               "seconds": elapsed,
+               "calls_per_sec": len(latencies) / elapsed if elapsed > 0 else 0.0,
+               "max_ms": latencies[-1] * 1000 if latencies else 0.0 }
+    for percent in percentiles:
+        result[f"p{percent}_ms"] = get_percentile(latencies, percent) * 1000
+
+    return result
+
+def print_results(results):
+    """Print a table of load test results."""
+    print(f"{'procedure':<30} {'calls':>7} {'errors':>6} {'calls/s':>9} "
+          + " ".join(f"{'p' + str(percent) + ' ms':>8}" for percent in percentiles)
+          + f" {'max ms':>8}")
+    for result in results:
+        print(f"{result['procedure']:<30} {result['calls']:>7} {result['errors']:>6} "
+              f"{result['calls_per_sec']:>9.0f} "
+              + " ".join(f"{result[f'p{percent}_ms']:>8.2f}" for percent in percentiles)
+              + f" {result['max_ms']:>8.2f}")
+
+    for result in results:
+        if result["error"]:
+            print(f"{result['procedure']}: {result['errors']} failed calls, first: "
+                  f"{result['error']}", file=sys.stderr)
+
+def open_connection(args):
+    """Open a connection to the --database database, committing each statement."""
+    conn = sgdb.make_connection(args.host, args.user, args.password)
+    if conn is None:
+        sys.exit(1)
+
+    conn.autocommit(True)
+    conn.select_db(args.database)
+    return conn
+
+def main():
+    """Load test entry point."""
+    parser = argparse.ArgumentParser(description="generated procedures load test")
+    parser.add_argument("-H", "--host", default="localhost",
+                        help="server host, default localhost")
+    parser.add_argument("-u", "--user", help="account user name")
+    parser.add_argument("-p", "--password", help="account password")
+    parser.add_argument("-d", "--database", required=True,
+                        help="scratch database holding the table")
+    parser.add_argument("-t", "--table", required=True,
+                        help="table to seed and whose procedures are called")
+    parser.add_argument("-n", "--rows", type=int, default=10000,
+                        help="number of synthetic rows to insert first, default 10000")
+    parser.add_argument("--batch", type=int, default=500,
+                        help="rows per INSERT statement, default 500")
+    parser.add_argument("-c", "--connections", type=int, default=8,
+                        help="number of connections calling at the same time, default 8")
+    parser.add_argument("--calls", type=int, default=2000,
+                        help="number of calls of each procedure, default 2000")
+    parser.add_argument("-k", "--kinds", default=default_kinds,
+                        help=f"comma-separated procedure kinds, default {default_kinds}")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="seed of the synthetic values")
+    parser.add_argument("--keep", action="store_true",
+                        help="leave the load procedures in the database")
+    parser.add_argument("--json", metavar="FILE",
+                        help="save the results to FILE")
+    args = parser.parse_args()
+
+    kinds = [ kind.strip() for kind in args.kinds.split(",") if kind.strip() ]
+    rng = random.Random(args.seed)
+
+    conn = open_connection(args)
+    columns = sgdb.collect_table_columns(conn, args.database, args.table)
+    if len(columns) == 0:
+        print(f"Table '{args.table}' not found in database '{args.database}'", file=sys.stderr)
+        return 1
+
+    details = read_details(conn, args.database, args.table, kinds)
+    model = TableModel(args.table, columns, indexes=details.get("indexes"))
+
+    start = time.perf_counter()
+    seed_table(conn, model, max(0, args.rows), max(1, args.batch), rng)
+    print(f"seeded {args.rows} rows in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+
+    keys = read_keys(conn, model)
+    prefix = f"Load_{args.table.capitalize()}_"
+    procedures, texts = render_procedures(args.table, columns, details, kinds, prefix)
+
+    connections = []
+    results = []
+    added = []
+    try:
+        sgdeploy.deploy_scripts(conn, args.database, texts, script_options["delimiter"])
+        connections = [ open_connection(args) for _ in range(max(1, args.connections)) ]
+
+        for number, procedure in enumerate(procedures):
+            delete_keys = collections.deque()
+            if procedure.kind == "delete":
+                delete_keys.extend(added)
+                delete_keys.extend(rng.sample(keys, len(keys)))
+                added = []
+
+            results.append(load_procedure(connections, procedure, model, args.calls, keys,
+                                          delete_keys, added, args.seed + number * 1000))
+    finally:
+        for connection in connections:
+            connection.close()
+
+        # deploy_scripts() leaves the connection in information_schema,
+        # so the procedures are named with their database:
+        if not args.keep:
+            with conn.cursor() as cur:
+                for procedure in procedures:
+                    cur.execute(f"DROP PROCEDURE IF EXISTS `{args.database}`.`{procedure.name}`")
+        conn.close()
+
+    print_results(results)
+
+    if args.json:
+        with open(args.json, mode="wt", encoding="utf-8") as jsonfile:
+            json.dump({ "python": sys.version.split()[0],
+                        "table": args.table,
+                        "rows": args.rows,
+                        "connections": max(1, args.connections),
+                        "results": results }, jsonfile, indent=1)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+
+"""Startup-time benchmark for the schemagen command.
+
+Runs schemagen commands that need no database server several times each
+and reports their wall times next to the time of a bare Python startup.
+Each command is also run once with `-X importtime` to confirm that it
+doesn't import modules it has no use for, pymysql in particular.
+
+The exit status is 1 if a command imports a forbidden module or, when
+--max-ms is set, if its median time exceeds the limit, so the benchmark
+can be used to catch startup regressions.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+bench_path = os.path.dirname(os.path.realpath(__file__))
+schemagen_path = os.path.join(os.path.dirname(bench_path), "schemagen")
+
+# Modules that no command in this benchmark should load:
+always_forbidden = [ "pymysql" ]
+
+# Modules of the code generator, not needed by commands that don't generate:
+generator_modules = [ "sgtables", "sgscripts", "curbedprinter", "concurrent.futures" ]
+
+
+def write_snapshot(path):
+    """Write a minimal snapshot file for the --from-snapshot command."""
+    snapshot = {
+        "format": "schemagen-snapshot",
+        "version": 1,
+        "created": "",
+        "host": "localhost",
+        "databases": [ "bench" ],
+        "column_names": [ "COLUMN_NAME" ],
+        "schemas": { "bench": { "tables": [ "Person" ], "procedures": [],
+                                "columns": { "Person": [ [ "id" ] ] } } }
+    }
+    with open(path, mode="wt", encoding="utf-8") as snapfile:
+        json.dump(snapshot, snapfile)
+
+def get_commands(snapshot_path, socket_path):
+    """Return (label, argv, forbidden modules) for each benchmarked command."""
+    return [
+        ("--help", [ "--help" ], generator_modules),
+        ("--args", [ "--args", "-H", "localhost", "-u", "bench" ], generator_modules),
+        ("--client (no server)", [ "--client", socket_path, "-l", "tables" ], generator_modules),
+        ("--from-snapshot -l tables",
+         [ "--from-snapshot", snapshot_path, "-d", "bench", "-l", "tables" ], generator_modules),
+    ]
+
+def time_command(argv, runs):
+    """Return the wall times, in milliseconds, of `runs` runs of `argv`."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        times.append((time.perf_counter() - start) * 1000)
+
+    return times
+
+def get_imported_modules(argv):
+    """Return the names of the modules imported by running `argv`."""
+    result = subprocess.run([ sys.executable, "-X", "importtime" ] + argv[1:],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True, check=False)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+
+    return modules
+
+def main():
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description="schemagen startup benchmark")
+    parser.add_argument("-r", "--runs", type=int, default=10,
+                        help="number of times to run each command")
+    parser.add_argument("--max-ms", type=float,
+                        help="fail if a command's median time exceeds this many milliseconds")
+    args = parser.parse_args()
+
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        snapshot_path = os.path.join(tempdir, "bench.snapshot")
+        write_snapshot(snapshot_path)
+
+        baseline = statistics.median(time_command([ sys.executable, "-c", "pass" ], args.runs))
+        print(f"{'command':<28} {'median ms':>10} {'min ms':>8} {'over python':>12}")
+        print(f"{'python -c pass':<28} {baseline:>10.1f}")
+
+        for label, argv, forbidden in get_commands(snapshot_path,
+                                                   os.path.join(tempdir, "none.sock")):
+            argv = [ sys.executable, schemagen_path ] + argv
+            times = time_command(argv, args.runs)
+            median = statistics.median(times)
+            print(f"{label:<28} {median:>10.1f} {min(times):>8.1f} {median - baseline:>12.1f}")
+
+            imported = get_imported_modules(argv)
+            for module in always_forbidden + forbidden:
+                if module in imported:
+                    failures.append(f"{label} imported {module}")
+
+            if args.max_ms is not None and median > args.max_ms:
+                failures.append(f"{label} took {median:.1f} ms, limit {args.max_ms} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
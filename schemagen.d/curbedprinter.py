@@ -5,6 +5,8 @@
    text for SQL keywords in an SQL statement.
 """
 
+import sys
+
 class CurbedPrinter:
     """Class for restricted printing."""
     # saved constructor arguments:
@@ -12,13 +14,15 @@ class CurbedPrinter:
     limit = 0
     separator = ','
     first_indent = 0
+    sink = None
 
     # derived values
     len_separator = 0
     text_length = 0
     items_limit = 0
 
-    def __init__(self, indent, limit, separator=", ", first_indent=0, items_per_line=-1):
+    def __init__(self, indent, limit, separator=", ", first_indent=0, items_per_line=-1,
+                 sink=None):
         """Constructor for CurbedPrinter
 
         Args:
@@ -33,6 +37,8 @@ class CurbedPrinter:
            items_per_line (integer): restriction of items per line, defaulting to -1 for
                                      unrestricted.  The other typical value would be 1 for
                                      singleton items for easier post-generation editing.
+           sink (object):          object with a `write` method that receives the output,
+                                   defaulting to None for sys.stdout
 
         Returns:
            None
@@ -42,6 +48,7 @@ class CurbedPrinter:
         self.limit = limit
         self.separator = separator
         self.first_indent = first_indent
+        self.sink = sink
 
         self.len_separator = len(separator)
         self.text_length = limit - indent
@@ -62,6 +69,17 @@ class CurbedPrinter:
 
         print()
 
+    def format_line(self, items_subset, first=False, final=False):
+        """Returns a line of text, see print_line()."""
+        if (first and self.first_indent != self.indent):
+            spaces = self.first_indent
+        else:
+            spaces = self.indent
+
+        return ((spaces * ' ')
+                + self.separator.join(items_subset)
+                + ('' if final else ',\n'))
+
     def print_line(self, items_subset, first=False, final=False):
         """Prints a line of text.
 
@@ -74,26 +92,18 @@ class CurbedPrinter:
         Returns:
            None
         """
-        spaces = self.indent
-        if (first and self.first_indent != self.indent):
-            spaces = self.first_indent
-        else:
-            spaces = self.indent
+        (self.sink or sys.stdout).write(self.format_line(items_subset, first, final))
 
-        print((spaces * ' '), end='')
-        print(self.separator.join(items_subset), end = '' if final else ',\n')
-
-    def print(self, items, end='\n'):
-        """Main class method, prints all items with given restrictions.
+    def format(self, items):
+        """Returns the text that print() would print, without the `end` string.
 
         Args:
            items (list):    complete list of items to print
-           end (string):    conform to python printing standard to allow
-                            the omission of a terminating newline
 
         Returns:
-           None
+           (string): the lines of items
         """
+        lines = []
         line = []
         accrued = 0
         first_line = True
@@ -108,16 +118,29 @@ class CurbedPrinter:
                 accrued = newlen
                 item_count += 1
             else:
-                self.print_line(line, first=first_line)
+                lines.append(self.format_line(line, first=first_line))
                 first_line = False
                 line = [item]
                 accrued = itemlen
                 item_count = 1
 
         if len(line) > 0:
-            self.print_line(line, first=first_line, final = True)
+            lines.append(self.format_line(line, first=first_line, final = True))
+
+        return "".join(lines)
+
+    def print(self, items, end='\n'):
+        """Main class method, prints all items with given restrictions.
+
+        Args:
+           items (list):    complete list of items to print
+           end (string):    conform to python printing standard to allow
+                            the omission of a terminating newline
 
-        print(end, end="")
+        Returns:
+           None
+        """
+        (self.sink or sys.stdout).write(self.format(items) + end)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+"""Client for the schemagen server in sgdaemon.
+
+This module only imports what it needs to send a request, so a client
+call avoids the startup cost of the generator modules.
+"""
+
+import json
+import os
+import socket
+
+
+def run_client(socket_path, argv, stdout, stderr):
+    """Send a request to a server and write its response.
+
+    Args:
+       socket_path (string): path of the server's unix socket
+       argv (list):          command line arguments for the request
+       stdout (object):      file that receives the request's standard output
+       stderr (object):      file that receives the request's error output
+
+    Returns:
+       (integer): the exit status of the request
+    """
+    request = { "cwd": os.getcwd(), "argv": argv }
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with client.makefile("rb") as reader:
+            response = json.loads(reader.readline())
+
+    stdout.write(response["stdout"])
+    stderr.write(response["stderr"])
+    return response["status"]
@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+
+"""A long-running schemagen server on a local unix socket, and its client.
+
+The server keeps its database connection open and caches table columns,
+indexes and partitioning between requests, so a request costs neither a
+connection handshake nor, for unchanged tables, their queries.  The cache
+is validated with the single aggregated signature query from
+sgdb.get_table_signatures(), after which only the changed tables are
+collected again.
+
+A request is a JSON line holding the client's working directory and
+command line arguments.  The response is a JSON line holding the text
+the request wrote to stdout and stderr and an exit status.  The client
+side is in the sgclient module, which is kept small for a fast startup.
+
+The requests run with the server's database credentials and write files
+where they ask to, so the socket is only accessible to the server's
+user, and a request must come from a process of that user whose working
+directory is the request's.
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import time
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+import sgdb
+#pylint: enable=import-error
+
+
+class MetadataCache:
+    """Cache of the table columns and the details covered by the table
+    signatures, like indexes, of the databases used by requests.
+
+    The methods that read table information take the same arguments as the
+    same-named functions in sgdb, so an instance can be used as the source
+    module of the main program's functions.
+    """
+    ttl = 0
+    schemas = None
+
+    def __init__(self, ttl=0):
+        """Constructor.
+
+        Args:
+           ttl (number): seconds during which cached columns are used without
+                         checking the table signatures, 0 to check on every
+                         request
+        """
+        self.ttl = ttl
+        self.schemas = {}
+
+    def refresh(self, conn, database):
+        """Bring the cached columns of `database` up to date, and drop the
+        cached details of the tables that changed.
+
+        Returns:
+           (dictionary): table name -> list of column dictionaries
+        """
+        now = time.monotonic()
+        entry = self.schemas.get(database)
+        if entry and now - entry["checked"] < self.ttl:
+            return entry["columns"]
+
+        signatures = sgdb.get_table_signatures(conn, database)
+
+        if entry is None:
+            entry = { "signatures": {}, "columns": {}, "details": {} }
+            changed = None
+        else:
+            changed = [ table for table, sig in signatures.items()
+                        if entry["signatures"].get(table) != sig ]
+
+        if changed is None or len(changed) > 0:
+            entry["columns"].update(sgdb.collect_database_columns(conn, database, changed))
+
+        for table in [ table for table in entry["columns"] if table not in signatures ]:
+            del entry["columns"][table]
+
+        # Cached details are read again when their table's signature changes:
+        for cached in entry["details"].values():
+            for table in [ table for table in cached
+                           if table not in signatures or table in (changed or ()) ]:
+                del cached[table]
+
+        entry["signatures"] = signatures
+        entry["checked"] = now
+        self.schemas[database] = entry
+
+        return entry["columns"]
+
+    def collect_table_columns(self, conn, database, table):
+        """ Collect table fields, see sgdb.collect_table_columns()."""
+        return list(self.refresh(conn, database).get(table, []))
+
+    def collect_database_columns(self, conn, database, tables=None):
+        """ Collect the fields of many tables, see sgdb.collect_database_columns()."""
+        columns = self.refresh(conn, database)
+        if tables is None:
+            tables = sorted(columns)
+
+        return { table: list(columns[table]) for table in tables if table in columns }
+
+    def iter_database_columns(self, conn, database, tables=None):
+        """ Stream the fields of many tables, see sgdb.iter_database_columns()."""
+        yield from self.collect_database_columns(conn, database, tables).items()
+
+    @staticmethod
+    def collect_table_rows(conn, database, tables=None):
+        """ Collect estimated row counts, see sgdb.collect_table_rows().
+
+        The estimates change without changing the table signatures,
+        so they are read from the server on every request.
+        """
+        return sgdb.collect_table_rows(conn, database, tables)
+
+    def collect_cached_detail(self, conn, database, tables, function):
+        """Collect a table detail through the cache.
+
+        Only the details of tables missing from the cache are read from
+        the server, with a single query.
+
+        Args:
+           conn (object):     open mysql connection
+           database (string): name of the database
+           tables (list):     names of the tables, None for every table
+           function (function): the sgdb function that collects the detail
+
+        Returns:
+           (dictionary): table name -> detail, for the tables that have one
+        """
+        columns = self.refresh(conn, database)
+        cached = self.schemas[database]["details"].setdefault(function.__name__, {})
+        if tables is None:
+            tables = sorted(columns)
+
+        missing = [ table for table in tables if table not in cached ]
+        if len(missing) > 0:
+            collected = function(conn, database, None if len(missing) == len(columns) else missing)
+            for table in missing:
+                cached[table] = collected.get(table)
+
+        return { table: cached[table] for table in tables if cached.get(table) is not None }
+
+    def collect_table_indexes(self, conn, database, tables=None):
+        """ Collect table indexes, see sgdb.collect_table_indexes().
+
+        The table signatures cover the indexes, so they are cached like
+        the columns.
+        """
+        return self.collect_cached_detail(conn, database, tables, sgdb.collect_table_indexes)
+
+    def collect_table_unique_keys(self, conn, database, tables=None):
+        """ Collect the unique indexes of tables, see sgdb.collect_table_unique_keys().
+
+        Like the other indexes, they are cached.
+        """
+        return self.collect_cached_detail(conn, database, tables,
+                                          sgdb.collect_table_unique_keys)
+
+    def collect_table_partitions(self, conn, database, tables=None):
+        """ Collect the partitioning of tables, see sgdb.collect_table_partitions().
+
+        The table signatures cover the partitioning, so it is cached.
+        """
+        return self.collect_cached_detail(conn, database, tables, sgdb.collect_table_partitions)
+
+    def collect_table_children(self, conn, database, tables=None):
+        """ Collect the foreign keys that refer to tables, see
+        sgdb.collect_table_children().
+
+        The foreign keys are read from the server on every request, and
+        the columns of the referring tables from the cache.
+        """
+        foreign_keys = sgdb.collect_foreign_keys(conn, database, tables)
+        tables_columns = self.collect_database_columns(conn, database,
+                                                       sgdb.get_child_table_names(foreign_keys))
+        return sgdb.make_table_children(foreign_keys, tables_columns)
+
+    def get_list_of_table_fields(self, conn, database, table):
+        """Returns a list of field names for the given table."""
+        print(f"[32;1mFields in table '{table}' in database '{database}'[m" )
+        return [ field["COLUMN_NAME"] for field in self.collect_table_columns(conn,
+                                                                              database,
+                                                                              table) ]
+
+    @staticmethod
+    def get_list_of_table_names(conn, database):
+        """ Returns a list of tables for given database."""
+        return sgdb.get_list_of_table_names(conn, database)
+
+    @staticmethod
+    def get_list_of_procedure_names(conn, database):
+        """Returns a list of procedures for given database."""
+        return sgdb.get_list_of_procedure_names(conn, database)
+
+    @staticmethod
+    def get_list_of_database_names(conn):
+        """ Returns a list of database names for the connection's host."""
+        return sgdb.get_list_of_database_names(conn)
+
+
+def get_peer_credentials(connection):
+    """Return the (pid, uid, gid) of the process at the other end of a
+    unix socket connection, or None where SO_PEERCRED isn't supported."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+
+    credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                        struct.calcsize("3i"))
+    return struct.unpack("3i", credentials)
+
+def get_request_error(connection, cwd):
+    """Return the reason to refuse a request, or None.
+
+    Args:
+       connection (object): the request's socket connection
+       cwd (string):        working directory sent with the request
+
+    Returns:
+       (string): the reason, or None if the request may run
+    """
+    if not isinstance(cwd, str) or not os.path.isdir(cwd):
+        return f"Request working directory '{cwd}' is not a directory"
+
+    credentials = get_peer_credentials(connection)
+    if credentials is None:
+        return None
+
+    pid, uid, _ = credentials
+    if uid != os.getuid():
+        return f"Requests from user id {uid} are not served"
+
+    try:
+        if not os.path.samefile(cwd, f"/proc/{pid}/cwd"):
+            return f"Request working directory '{cwd}' is not the client's"
+    except OSError:
+        # Without /proc, the caller is trusted as the server's own user
+        pass
+
+    return None
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Runs a single request on the server's `run_request` function."""
+
+    def handle(self):
+        """Read a request, run it with captured output, and send the response."""
+        request = json.loads(self.rfile.readline())
+
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        status = 0
+
+        error = get_request_error(self.connection, request.get("cwd"))
+        if error is not None:
+            response = { "stdout": "", "stderr": error + "\n", "status": 1 }
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            return
+
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                os.chdir(request["cwd"])
+                self.server.run_request(request["argv"])
+            except SystemExit as err:
+                status = err.code if isinstance(err.code, int) else 1
+            except Exception as err:  #pylint: disable=broad-except
+                print(f"Unexpected {err=}, {type(err)=}", file=stderr)
+                status = 1
+
+        response = { "stdout": stdout.getvalue(), "stderr": stderr.getvalue(),
+                     "status": status }
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class SchemagenServer(socketserver.UnixStreamServer):
+    """Unix socket server that handles one request at a time."""
+    run_request = None
+
+    def __init__(self, socket_path, run_request):
+        """Constructor.
+
+        Args:
+           socket_path (string):  path of the unix socket to create
+           run_request (function): called with the command line arguments
+                                   (list of strings) of each request
+        """
+        self.run_request = run_request
+        super().__init__(socket_path, RequestHandler)
+
+    def server_bind(self):
+        """Create the socket accessible only to the server's user."""
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        os.chmod(self.server_address, 0o600)
+
+
+def serve(socket_path, run_request):
+    """Handle requests on `socket_path` until interrupted or terminated.
+
+    Args:
+       socket_path (string):   path of the unix socket to create
+       run_request (function): called with the command line arguments
+                               (list of strings) of each request
+
+    Returns:
+       None
+    """
+    # Replace the socket of a stopped server, but no other kind of file:
+    if os.path.lexists(socket_path):
+        if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+            print(f"'{socket_path}' exists and is not a socket", file=sys.stderr)
+            raise FileExistsError(socket_path)
+        os.remove(socket_path)
+
+    # Exit through the `finally` clause below on SIGTERM:
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    with SchemagenServer(socket_path, run_request) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
@@ -6,11 +6,26 @@ import re
 import socket   # For resolving host names
 import sys      # to direct error output to sys.stderr
 
-import pymysql
-import pymysql.cursors
+# pymysql is imported by make_connection() rather than here, so
+# that commands that don't connect to a server don't pay for it.
 
 reip = re.compile("\\d{1,3}(\\.\\d{1,3}){3}")
 
+# information_schema.COLUMNS fields that describe a table column
+# to the script generator:
+column_field_names = [
+    "COLUMN_NAME",
+    "DATA_TYPE",
+    "CHARACTER_MAXIMUM_LENGTH",
+    "NUMERIC_PRECISION",
+    "NUMERIC_SCALE",
+    "IS_NULLABLE",
+    "COLUMN_KEY",
+#    "DATATIME_PRECISION",
+    "COLUMN_TYPE",
+    "EXTRA"
+]
+
 def resolve_host(host):
     """Attempt to resolve an IP address from a host name.
 
@@ -45,6 +60,10 @@ def make_connection(host, user, password):
     Returns:
       None
     """
+    #pylint: disable=import-outside-toplevel
+    import pymysql
+    import pymysql.cursors
+
     try:
         return pymysql.connect(host = resolve_host(host),
                                user = user,
@@ -65,26 +84,210 @@ def prep_query_table_columns(database, table):
     Returns:
        string query
     """
-    colnames=[
-        "COLUMN_NAME",
-        "DATA_TYPE",
-        "CHARACTER_MAXIMUM_LENGTH",
-        "NUMERIC_PRECISION",
-        "NUMERIC_SCALE",
-        "IS_NULLABLE",
-        "COLUMN_KEY",
-#        "DATATIME_PRECISION",
-        "COLUMN_TYPE",
-        "EXTRA"
-    ]
-
     qtemplate="""
 SELECT {}
   FROM information_schema.COLUMNS
  WHERE TABLE_SCHEMA = '{}'
    AND TABLE_NAME = '{}'"""
 
-    return qtemplate.format(", ".join(colnames), database, table)
+    return qtemplate.format(", ".join(column_field_names), database, table)
+
+def prep_query_database_columns(database, tables=None):
+    """ Generates an SQL expression for collecting the field data of
+    many tables with a single query.
+
+    Args:
+       database (string):        Name of the database
+       tables (list, optional):  Names of tables to include, None for
+                                 every table in the database
+    Returns:
+       string query
+    """
+    qtemplate="""
+SELECT TABLE_NAME, {}
+  FROM information_schema.COLUMNS
+ WHERE TABLE_SCHEMA = '{}'{}
+ ORDER BY TABLE_NAME, ORDINAL_POSITION"""
+
+    tables_clause = ""
+    if tables is not None:
+        names = ", ".join(f"'{table}'" for table in tables)
+        tables_clause = f"\n   AND TABLE_NAME IN ({names})"
+
+    return qtemplate.format(", ".join(column_field_names), database, tables_clause)
+
+def prep_query_table_signatures(database):
+    """ Generate an SQL expression for a cheap per-table signature of
+    the definitions of every table in a database that affect the
+    generated scripts.
+
+    The signature joins, with `/`, the column count and a checksum of the
+    column attributes, the index column count and a checksum of the index
+    columns, a checksum of the partitioning, and the count and a checksum
+    of the columns of the foreign keys that refer to the table.  So any
+    ALTER TABLE that affects the generated scripts, including one that
+    only adds an index, repartitions the table, or adds a foreign key to
+    another table that refers to it, changes the signature of the table.
+
+    The estimated TABLE_ROWS is selected beside the signature, since it
+    changes too often to be a part of it, see get_table_signatures().
+
+    Args:
+       database (string):  Name of the database
+    Returns:
+       string query
+    """
+    qtemplate="""
+SELECT t.TABLE_NAME, t.TABLE_ROWS,
+       CONCAT_WS('/', c.SIGNATURE, COALESCE(s.SIGNATURE, '0:0'), COALESCE(p.SIGNATURE, '0'),
+                 COALESCE(f.SIGNATURE, '0:0')) AS SIGNATURE
+  FROM information_schema.TABLES t
+       INNER JOIN
+       (SELECT TABLE_NAME,
+               CONCAT(COUNT(*), ':',
+                      BIT_XOR(CRC32(CONCAT_WS('|', ORDINAL_POSITION, COLUMN_NAME, COLUMN_TYPE,
+                                              IS_NULLABLE, COLUMN_KEY, EXTRA)))) AS SIGNATURE
+          FROM information_schema.COLUMNS
+         WHERE TABLE_SCHEMA = '{0}'
+         GROUP BY TABLE_NAME) c
+       ON c.TABLE_NAME = t.TABLE_NAME
+       LEFT JOIN
+       (SELECT TABLE_NAME,
+               CONCAT(COUNT(*), ':',
+                      BIT_XOR(CRC32(CONCAT_WS('|', INDEX_NAME, SEQ_IN_INDEX, COLUMN_NAME,
+                                              NON_UNIQUE, INDEX_TYPE)))) AS SIGNATURE
+          FROM information_schema.STATISTICS
+         WHERE TABLE_SCHEMA = '{0}'
+         GROUP BY TABLE_NAME) s
+       ON s.TABLE_NAME = t.TABLE_NAME
+       LEFT JOIN
+       (SELECT TABLE_NAME,
+               CRC32(MAX(CONCAT_WS('|', PARTITION_METHOD, PARTITION_EXPRESSION,
+                                   SUBPARTITION_METHOD, SUBPARTITION_EXPRESSION))) AS SIGNATURE
+          FROM information_schema.PARTITIONS
+         WHERE TABLE_SCHEMA = '{0}'
+           AND PARTITION_METHOD IS NOT NULL
+         GROUP BY TABLE_NAME) p
+       ON p.TABLE_NAME = t.TABLE_NAME
+       LEFT JOIN
+       (SELECT REFERENCED_TABLE_NAME,
+               CONCAT(COUNT(*), ':',
+                      BIT_XOR(CRC32(CONCAT_WS('|', TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION,
+                                              COLUMN_NAME, REFERENCED_COLUMN_NAME)))) AS SIGNATURE
+          FROM information_schema.KEY_COLUMN_USAGE
+         WHERE TABLE_SCHEMA = '{0}'
+           AND REFERENCED_TABLE_SCHEMA = '{0}'
+         GROUP BY REFERENCED_TABLE_NAME) f
+       ON f.REFERENCED_TABLE_NAME = t.TABLE_NAME
+ WHERE t.TABLE_SCHEMA = '{0}'"""
+
+    return qtemplate.format(database)
+
+def prep_query_table_rows(database, tables=None):
+    """ Generate an SQL expression for the estimated row counts of tables.
+
+    Args:
+       database (string):        Name of the database
+       tables (list, optional):  Names of tables to include, None for
+                                 every table in the database
+    Returns:
+       string query
+    """
+    qtemplate="""
+SELECT TABLE_NAME, TABLE_ROWS
+  FROM information_schema.TABLES
+ WHERE TABLE_SCHEMA = '{}'{}"""
+
+    tables_clause = ""
+    if tables is not None:
+        names = ", ".join(f"'{table}'" for table in tables)
+        tables_clause = f"\n   AND TABLE_NAME IN ({names})"
+
+    return qtemplate.format(database, tables_clause)
+
+def prep_query_table_indexes(database, tables=None, unique=False):
+    """ Generate an SQL expression for the columns of the indexes of tables.
+
+    FULLTEXT and SPATIAL indexes are left out, as they can't serve the
+    equality conditions of the generated procedures.
+
+    Args:
+       database (string):        Name of the database
+       tables (list, optional):  Names of tables to include, None for
+                                 every table in the database
+       unique (boolean, optional): True to include only unique indexes
+    Returns:
+       string query
+    """
+    qtemplate="""
+SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME
+  FROM information_schema.STATISTICS
+ WHERE TABLE_SCHEMA = '{}'
+   AND INDEX_TYPE NOT IN ('FULLTEXT', 'SPATIAL'){}
+ ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX"""
+
+    tables_clause = ""
+    if tables is not None:
+        names = ", ".join(f"'{table}'" for table in tables)
+        tables_clause = f"\n   AND TABLE_NAME IN ({names})"
+    if unique:
+        tables_clause += "\n   AND NON_UNIQUE = 0"
+
+    return qtemplate.format(database, tables_clause)
+
+def prep_query_table_partitions(database, tables=None):
+    """ Generate an SQL expression for the partitioning of tables.
+
+    Args:
+       database (string):        Name of the database
+       tables (list, optional):  Names of tables to include, None for
+                                 every table in the database
+    Returns:
+       string query
+    """
+    qtemplate="""
+SELECT DISTINCT TABLE_NAME, PARTITION_METHOD, PARTITION_EXPRESSION,
+       SUBPARTITION_METHOD, SUBPARTITION_EXPRESSION
+  FROM information_schema.PARTITIONS
+ WHERE TABLE_SCHEMA = '{}'
+   AND PARTITION_METHOD IS NOT NULL{}"""
+
+    tables_clause = ""
+    if tables is not None:
+        names = ", ".join(f"'{table}'" for table in tables)
+        tables_clause = f"\n   AND TABLE_NAME IN ({names})"
+
+    return qtemplate.format(database, tables_clause)
+
+def prep_query_foreign_keys(database, tables=None):
+    """ Generate an SQL expression for the columns of the foreign keys
+    that refer to tables.
+
+    Args:
+       database (string):        Name of the database
+       tables (list, optional):  Names of the referenced tables to include,
+                                 None for every table in the database
+    Returns:
+       string query
+    """
+    qtemplate="""
+SELECT k.REFERENCED_TABLE_NAME, k.TABLE_NAME, k.CONSTRAINT_NAME,
+       k.COLUMN_NAME, k.REFERENCED_COLUMN_NAME
+  FROM information_schema.KEY_COLUMN_USAGE k
+       INNER JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+       ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA
+          AND r.TABLE_NAME = k.TABLE_NAME
+          AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+ WHERE k.TABLE_SCHEMA = '{0}'
+   AND k.REFERENCED_TABLE_SCHEMA = '{0}'{1}
+ ORDER BY k.REFERENCED_TABLE_NAME, k.TABLE_NAME, k.CONSTRAINT_NAME, k.ORDINAL_POSITION"""
+
+    tables_clause = ""
+    if tables is not None:
+        names = ", ".join(f"'{table}'" for table in tables)
+        tables_clause = f"\n   AND k.REFERENCED_TABLE_NAME IN ({names})"
+
+    return qtemplate.format(database, tables_clause)
 
 def prep_query_tables_list(database):
     """ Generate an SQL expression for collecting table names in database.
@@ -114,6 +317,22 @@ SELECT ROUTINE_NAME
 
     return qtemplate.format(database)
 
+def prep_query_procedure_definitions(database):
+    """Generate an SQL expression for collecting the name, body and comment
+    of every procedure in a database.
+    Args:
+       database (string): Name of the database
+    Returns:
+       string query
+    """
+    qtemplate="""
+SELECT ROUTINE_NAME, ROUTINE_DEFINITION, ROUTINE_COMMENT
+  FROM information_schema.ROUTINES
+ WHERE ROUTINE_SCHEMA = '{}'
+   AND ROUTINE_TYPE = 'PROCEDURE' """
+
+    return qtemplate.format(database)
+
 
 def collect_table_columns(conn, database, table):
     """ Collect table fields into a reusable structure.
@@ -130,8 +349,7 @@ def collect_table_columns(conn, database, table):
     try:
         with conn.cursor() as cur:
             cur.execute(query)
-            rows = cur.fetchall()
-            for row in rows:
+            for row in cur:
                 table_def.append(row)
 
             return table_def
@@ -140,34 +358,346 @@ def collect_table_columns(conn, database, table):
         print(f"Unexpected {err=}, {type(err)=}")
         raise
 
-def get_table_column_by_name(table_columns_list, column_name):
-    """Seeks by name a table column from a list
+def collect_database_columns(conn, database, tables=None):
+    """ Collect the fields of many tables with a single query.
+
+    The rows are grouped by table in one pass.  Each table's list
+    has the same form as the output of collect_table_columns().
 
     Args:
-       table_columns_list (list): Output from function collect_table_columns()
-       column_name (string):      Name of column to find
+       conn (object):            open mysql connection
+       database (string):        Name of database
+       tables (list, optional):  Names of tables to collect, None
+                                 to collect every table in `database`
 
     Returns:
-       (dictionary): The column dictionary for the matched column,
-                     or None if the column isn't found
+       (dictionary): table name -> list of column dictionaries,
+                     ordered by table name
     """
-    for column in table_columns_list:
-        if column["COLUMN_NAME"] == column_name:
-            return column
+    if tables is not None and len(tables) == 0:
+        return {}
 
-    return None
+    query = prep_query_database_columns(database, tables)
+
+    tables_dict = {}
+    table_def = None
+    table_name = None
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            for row in cur:
+                name = row.pop("TABLE_NAME")
+                if name != table_name:
+                    table_name = name
+                    table_def = tables_dict.setdefault(name, [])
+                table_def.append(row)
+
+            return tables_dict
 
+    except BaseException as err:
+        print(f"Unexpected {err=}, {type(err)=}")
+        raise
+
+def iter_query_rows(conn, query, cursorclass=None):
+    """ Yield the rows of a query as they arrive from the server.
+
+    The query runs on an unbuffered, server-side cursor, so the rows are
+    not collected in memory.  No other query can run on the connection
+    until the generator is exhausted or closed.
+
+    Args:
+       conn (object):        open mysql connection
+       query (string):       SQL query
+       cursorclass (class, optional): cursor class to use instead of
+                             pymysql.cursors.SSDictCursor
 
-def prune_confirm_field_list(fields, confirm_fields):
-    """Return a list of confirm fields with appropriate names."""
-    pruned_list = []
-    for confirm_field in confirm_fields:
-        if confirm_field in fields:
-            confirm_field = confirm_field.copy()
-            confirm_field["COLUMN_NAME"] = "confirm_" + confirm_field["COLUMN_NAME"]
-            pruned_list.append(confirm_field)
+    Returns:
+       (iterator): row dictionaries
+    """
+    if cursorclass is None:
+        #pylint: disable=import-outside-toplevel
+        import pymysql.cursors
+        cursorclass = pymysql.cursors.SSDictCursor
 
-    return pruned_list
+    try:
+        with conn.cursor(cursorclass) as cur:
+            cur.execute(query)
+            yield from cur
+
+    except Exception as err:
+        print(f"Unexpected {err=}, {type(err)=}")
+        raise
+
+def iter_database_columns(conn, database, tables=None, cursorclass=None):
+    """ Stream the fields of many tables, one table at a time.
+
+    This is the streaming counterpart of collect_database_columns(): the
+    rows of a single query are grouped by table as they arrive, so only
+    the columns of the current table are held in memory.
+
+    Args:
+       conn (object):            open mysql connection
+       database (string):        Name of database
+       tables (list, optional):  Names of tables to collect, None
+                                 to collect every table in `database`
+       cursorclass (class, optional): see iter_query_rows()
+
+    Returns:
+       (iterator): (table name, list of column dictionaries) tuples,
+                   in the server's table name order
+    """
+    if tables is not None and len(tables) == 0:
+        return
+
+    query = prep_query_database_columns(database, tables)
+
+    table_def = None
+    table_name = None
+
+    for row in iter_query_rows(conn, query, cursorclass):
+        name = row.pop("TABLE_NAME")
+        if name != table_name:
+            if table_def is not None:
+                yield table_name, table_def
+            table_name = name
+            table_def = []
+        table_def.append(row)
+
+    if table_def is not None:
+        yield table_name, table_def
+
+def get_table_signatures(conn, database, rows_step=None):
+    """ Returns the definition signatures of the tables in a database,
+    see prep_query_table_signatures().
+
+    Args:
+       conn (object):     open mysql connection
+       database (string): Name of database
+       rows_step (function, optional): maps an estimated row count to the
+                          value that the signature includes, like
+                          sgmodel.get_default_page_size(), so a signature
+                          changes only when the estimate crosses a step.
+                          None to leave the row counts out.
+
+    Returns:
+       (dictionary): table name -> signature string
+    """
+    query = prep_query_table_signatures(database)
+    signatures = None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            signatures = {}
+            for row in cur:
+                signature = row["SIGNATURE"]
+                if rows_step is not None:
+                    signature += f"/{rows_step(row['TABLE_ROWS'])}"
+                signatures[row["TABLE_NAME"]] = signature
+
+    except BaseException as err:
+        print(f"Unexpected {err=}, {type(err)=}")
+        raise
+
+    return signatures
+
+def collect_table_rows(conn, database, tables=None):
+    """ Collect the estimated row counts of tables with a single query.
+
+    The counts are the TABLE_ROWS estimates of information_schema.TABLES,
+    which are only approximate for InnoDB tables.
+
+    Args:
+       conn (object):            open mysql connection
+       database (string):        Name of database
+       tables (list, optional):  Names of tables to collect, None
+                                 to collect every table in `database`
+
+    Returns:
+       (dictionary): table name -> estimated rows, None for views
+    """
+    if tables is not None and len(tables) == 0:
+        return {}
+
+    query = prep_query_table_rows(database, tables)
+    table_rows = None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            table_rows = {}
+            for row in cur:
+                table_rows[row["TABLE_NAME"]] = row["TABLE_ROWS"]
+
+    except BaseException as err:
+        print(f"Unexpected {err=}, {type(err)=}")
+        raise
+
+    return table_rows
+
+def collect_table_indexes(conn, database, tables=None, unique=False):
+    """ Collect the indexes of tables with a single query.
+
+    Indexes on expressions, which have no column name, are left out.
+
+    Args:
+       conn (object):            open mysql connection
+       database (string):        Name of database
+       tables (list, optional):  Names of tables to collect, None
+                                 to collect every table in `database`
+       unique (boolean, optional): True to collect only unique indexes
+
+    Returns:
+       (dictionary): table name -> dictionary of index name -> list of
+                     column names in index order, the primary key being
+                     the PRIMARY index
+    """
+    if tables is not None and len(tables) == 0:
+        return {}
+
+    query = prep_query_table_indexes(database, tables, unique)
+    table_indexes = None
+    skipped = set()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            table_indexes = {}
+            for row in cur:
+                index_name = row["INDEX_NAME"]
+                key = (row["TABLE_NAME"], index_name)
+                if row["COLUMN_NAME"] is None:
+                    skipped.add(key)
+                else:
+                    indexes = table_indexes.setdefault(row["TABLE_NAME"], {})
+                    indexes.setdefault(index_name, []).append(row["COLUMN_NAME"])
+
+    except BaseException as err:
+        print(f"Unexpected {err=}, {type(err)=}")
+        raise
+
+    for table, index_name in skipped:
+        table_indexes.get(table, {}).pop(index_name, None)
+
+    return table_indexes
+
+def collect_table_unique_keys(conn, database, tables=None):
+    """ Collect the unique indexes of tables, including the PRIMARY index,
+    see collect_table_indexes()."""
+    return collect_table_indexes(conn, database, tables, unique=True)
+
+def collect_table_partitions(conn, database, tables=None):
+    """ Collect the partitioning of tables with a single query.
+
+    Args:
+       conn (object):            open mysql connection
+       database (string):        Name of database
+       tables (list, optional):  Names of tables to collect, None
+                                 to collect every table in `database`
+
+    Returns:
+       (dictionary): table name -> dictionary of the partitioning "method"
+                     and "expression", and the "subpartition_method" and
+                     "subpartition_expression", for partitioned tables only
+    """
+    if tables is not None and len(tables) == 0:
+        return {}
+
+    query = prep_query_table_partitions(database, tables)
+    table_partitions = None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            table_partitions = {}
+            for row in cur:
+                table_partitions[row["TABLE_NAME"]] = {
+                    "method": row["PARTITION_METHOD"],
+                    "expression": row["PARTITION_EXPRESSION"],
+                    "subpartition_method": row["SUBPARTITION_METHOD"],
+                    "subpartition_expression": row["SUBPARTITION_EXPRESSION"] }
+
+    except BaseException as err:
+        print(f"Unexpected {err=}, {type(err)=}")
+        raise
+
+    return table_partitions
+
+def collect_foreign_keys(conn, database, tables=None):
+    """ Collect the foreign keys that refer to tables with a single query.
+
+    Args:
+       conn (object):            open mysql connection
+       database (string):        Name of database
+       tables (list, optional):  Names of the referenced tables to collect,
+                                 None to collect every table in `database`
+
+    Returns:
+       (dictionary): referenced table name -> list of foreign keys, ordered
+                     by referring table and constraint name, each a dictionary
+                     of the constraint "name", the referring "table", and its
+                     "columns" and the "referenced" columns, in key order
+    """
+    if tables is not None and len(tables) == 0:
+        return {}
+
+    query = prep_query_foreign_keys(database, tables)
+    foreign_keys = None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            foreign_keys = {}
+            for row in cur:
+                keys = foreign_keys.setdefault(row["REFERENCED_TABLE_NAME"], [])
+                if not keys or keys[-1]["table"] != row["TABLE_NAME"] \
+                   or keys[-1]["name"] != row["CONSTRAINT_NAME"]:
+                    keys.append({ "name": row["CONSTRAINT_NAME"], "table": row["TABLE_NAME"],
+                                  "columns": [], "referenced": [] })
+                keys[-1]["columns"].append(row["COLUMN_NAME"])
+                keys[-1]["referenced"].append(row["REFERENCED_COLUMN_NAME"])
+
+    except BaseException as err:
+        print(f"Unexpected {err=}, {type(err)=}")
+        raise
+
+    return foreign_keys
+
+def make_table_children(foreign_keys, tables_columns):
+    """Combine the foreign keys that refer to tables with the columns of
+    the referring tables.
+
+    Args:
+       foreign_keys (dictionary):   from collect_foreign_keys()
+       tables_columns (dictionary): table name -> column dictionaries of
+                                    at least the referring tables
+
+    Returns:
+       (dictionary): referenced table name -> list of foreign keys, as in
+                     `foreign_keys` with the "fields" of the referring table
+                     added to each key
+    """
+    return { table: [ dict(key, fields=tables_columns.get(key["table"], []))
+                      for key in keys ]
+             for table, keys in foreign_keys.items() }
+
+def get_child_table_names(foreign_keys):
+    """Return the sorted names of the tables that refer to others in `foreign_keys`."""
+    return sorted({ key["table"] for keys in foreign_keys.values() for key in keys })
+
+def collect_table_children(conn, database, tables=None):
+    """ Collect the foreign keys that refer to tables, with the columns of
+    the referring tables, see make_table_children().
+
+    Args:
+       conn (object):            open mysql connection
+       database (string):        Name of database
+       tables (list, optional):  Names of the referenced tables to collect,
+                                 None to collect every table in `database`
+
+    Returns:
+       (dictionary): referenced table name -> list of foreign keys
+    """
+    foreign_keys = collect_foreign_keys(conn, database, tables)
+    tables_columns = collect_database_columns(conn, database,
+                                              get_child_table_names(foreign_keys))
+    return make_table_children(foreign_keys, tables_columns)
 
 def get_list_of_table_names(conn, database):
     """ Returns a list of tables for given database.
@@ -185,8 +715,7 @@ def get_list_of_table_names(conn, database):
         with conn.cursor() as cur:
             cur.execute(query)
             table_name_list = []
-            rows = cur.fetchall()
-            for row in rows:
+            for row in cur:
                 table_name_list.append(row["TABLE_NAME"])
 
     except BaseException as err:
@@ -212,8 +741,7 @@ def get_list_of_procedure_names(conn, database):
         with conn.cursor() as cur:
             cur.execute(query)
             proc_name_list = []
-            rows = cur.fetchall()
-            for row in rows:
+            for row in cur:
                 proc_name_list.append(row["ROUTINE_NAME"])
 
     except BaseException as err:
@@ -222,6 +750,32 @@ def get_list_of_procedure_names(conn, database):
 
     return proc_name_list
 
+def get_procedure_definitions(conn, database):
+    """Returns the bodies and comments of the procedures of a database.
+
+    Args:
+       conn (object):     open mysql connection
+       database (string): Name of database
+
+    Returns:
+       (dictionary): procedure name -> (ROUTINE_DEFINITION, ROUTINE_COMMENT)
+    """
+    query = prep_query_procedure_definitions(database)
+    definitions = None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            definitions = {}
+            for row in cur:
+                definitions[row["ROUTINE_NAME"]] = (row["ROUTINE_DEFINITION"],
+                                                    row["ROUTINE_COMMENT"])
+
+    except BaseException as err:
+        print(f"Unexpected {err=}, {type(err)=}")
+        raise
+
+    return definitions
+
 def get_list_of_table_fields(conn, database, table):
     """Returns a list of field names for the given table.
 
@@ -240,8 +794,7 @@ def get_list_of_table_fields(conn, database, table):
         with conn.cursor() as cur:
             cur.execute(query)
             field_name_list = []
-            rows = cur.fetchall()
-            for row in rows:
+            for row in cur:
                 field_name_list.append(row["COLUMN_NAME"])
 
     except BaseException as err:
@@ -264,8 +817,7 @@ def get_list_of_database_names(conn):
         with conn.cursor() as cur:
             cur.execute(query)
             dbase_name_list = []
-            rows = cur.fetchall()
-            for row in rows:
+            for row in cur:
                 dbase_name_list.append(row["SCHEMA_NAME"])
 
     except BaseException as err:
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+"""Functions for deploying generated procedures directly to a database.
+
+Each deployed procedure is tagged with a COMMENT holding a hash of its
+generated CREATE PROCEDURE statement.  Before deploying, the body and
+comment of every procedure in the database are read with a single query,
+and procedures whose body and tag already match the generated code are
+skipped.  Recreating unchanged procedures would needlessly invalidate the
+server's stored routine cache and take metadata locks.
+
+The tag catches changes to the parameter list that comparing the body
+alone would miss.
+
+Changed procedures are replaced with MariaDB's CREATE OR REPLACE
+PROCEDURE, a single statement, so a failed deployment leaves the
+previous procedure in place rather than no procedure.
+"""
+
+import hashlib
+import re
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+import sgdb
+#pylint: enable=import-error
+
+TAG_PREFIX = "schemagen:"
+
+re_create = re.compile(r"CREATE\s+PROCEDURE\s+(\S+)\s*\(", re.IGNORECASE)
+re_create_keyword = re.compile(r"^CREATE\s+PROCEDURE\b", re.IGNORECASE)
+re_begin = re.compile(r"^BEGIN\b", re.MULTILINE)
+
+
+def split_statements(text, delimiter):
+    """Split script text into the statements terminated by `delimiter`.
+
+    Comment and blank lines between statements are discarded.
+
+    Args:
+       text (string):      generated script
+       delimiter (string): the statement delimiter used in the script
+
+    Returns:
+       (list): statements without delimiters
+    """
+    statements = []
+    lines = []
+    for line in text.splitlines():
+        stripped = line.rstrip()
+        if len(lines) == 0 and (stripped == "" or stripped.startswith("--")):
+            continue
+
+        if stripped.endswith(delimiter):
+            lines.append(stripped[:-len(delimiter)])
+            statements.append("\n".join(lines).strip())
+            lines = []
+        else:
+            lines.append(line)
+
+    return statements
+
+def split_create_statement(statement):
+    """Split a CREATE PROCEDURE statement into its declaration and body.
+
+    Args:
+       statement (string): a single statement from split_statements()
+
+    Returns:
+       (tuple): procedure name, declaration, and body (from BEGIN), or None
+                if `statement` isn't a CREATE PROCEDURE statement
+    """
+    match = re_create.match(statement)
+    if match is None:
+        return None
+
+    begin = re_begin.search(statement)
+    if begin is None:
+        return None
+
+    return match.group(1), statement[:begin.start()].rstrip(), statement[begin.start():]
+
+def get_deploy_tag(statement):
+    """Return the COMMENT value that identifies a generated statement."""
+    return TAG_PREFIX + hashlib.sha1(statement.encode("utf-8")).hexdigest()
+
+def deploy_script(conn, text, delimiter, existing):
+    """Execute the changed procedures of a generated script.
+
+    The connection must be using the target database.
+
+    Args:
+       conn (object):          open mysql connection
+       text (string):          generated script
+       delimiter (string):     the statement delimiter used in the script
+       existing (dictionary):  procedure definitions from
+                               sgdb.get_procedure_definitions(), which will be
+                               updated with the deployed procedures
+
+    Returns:
+       (tuple): lists of the names of deployed and unchanged procedures
+    """
+    deployed = []
+    unchanged = []
+
+    for statement in split_statements(text, delimiter):
+        parts = split_create_statement(statement)
+        if parts is None:
+            continue
+
+        name, declaration, body = parts
+        tag = get_deploy_tag(statement)
+
+        current = existing.get(name)
+        if current and current[1] == tag and (current[0] or "").strip() == body.strip():
+            unchanged.append(name)
+            continue
+
+        replace = re_create_keyword.sub("CREATE OR REPLACE PROCEDURE", declaration, count=1)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"{replace}\nCOMMENT '{tag}'\n{body}")
+
+        except BaseException as err:
+            print(f"Failed to deploy procedure {name}, {err=}")
+            raise
+
+        existing[name] = (body, tag)
+        deployed.append(name)
+
+    return deployed, unchanged
+
+def deploy_scripts(conn, database, texts, delimiter):
+    """Deploy the changed procedures of several generated scripts.
+
+    Args:
+       conn (object):      open mysql connection
+       database (string):  database in which the procedures are created
+       texts (iterable):   generated scripts
+       delimiter (string): the statement delimiter used in the scripts
+
+    Returns:
+       (tuple): lists of the names of deployed and unchanged procedures
+    """
+    existing = sgdb.get_procedure_definitions(conn, database)
+
+    deployed = []
+    unchanged = []
+
+    conn.select_db(database)
+    try:
+        for text in texts:
+            script_deployed, script_unchanged = deploy_script(conn, text, delimiter, existing)
+            deployed.extend(script_deployed)
+            unchanged.extend(script_unchanged)
+    finally:
+        conn.select_db("information_schema")
+
+    return deployed, unchanged
@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+
+"""EXPLAIN-based performance checks of generated procedures.
+
+The generated procedures are first created in a scratch database, which
+catches code that the server won't compile without touching the
+procedures of the --database database.  The scratch database is created
+by the check and dropped when it is done, so the check refuses to use a
+database that already exists.  Then every SELECT, UPDATE and
+DELETE statement of each procedure, with its parameters replaced by
+representative literals, is run through EXPLAIN in the --database
+database, so the plans reflect the statistics of the real tables.
+EXPLAIN doesn't execute the statements.
+
+A plan is flagged for a full table scan, a filesort, or a temporary
+table.  Full scans by statements without a WHERE clause, like the
+all-rows branch of a list procedure, select every row on purpose and
+are not flagged.
+"""
+
+import json
+import re
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+import sgdeploy
+#pylint: enable=import-error
+
+# Leading control flow of a statement, which is skipped to find its verb:
+re_control = re.compile(r"\s*(?:--[^\n]*|(?:ELSE)?IF\b.*?\bTHEN|ELSE|BEGIN|END\s+IF)",
+                        re.IGNORECASE | re.DOTALL)
+re_verb = re.compile(r"(SELECT|UPDATE|DELETE)\b", re.IGNORECASE)
+re_from = re.compile(r"\bFROM\b", re.IGNORECASE)
+re_where = re.compile(r"\bWHERE\b", re.IGNORECASE)
+re_quoted = re.compile(r"'((?:[^']|'')*)'")
+
+# Representative literals of parameter types, by the first word of the type:
+literal_values = {
+    "date":      "'2000-01-01'",
+    "datetime":  "'2000-01-01 00:00:00'",
+    "timestamp": "'2000-01-01 00:00:00'",
+    "time":      "'00:00:00'",
+    "year":      "2000",
+    "json":      "'{}'",
+}
+numeric_types = { "tinyint", "smallint", "mediumint", "int", "integer", "bigint", "decimal",
+                  "numeric", "float", "double", "real", "bit", "bool", "boolean" }
+
+
+class StatementCheck:
+    """The plan and problems of a statement of a procedure."""
+    sql = None
+    filtered = True
+    plan = None
+    problems = None
+    error = None
+
+    def __init__(self, sql, filtered):
+        """Constructor.
+
+        Args:
+           sql (string):        statement with literals for its parameters
+           filtered (boolean):  False if the statement has no WHERE clause
+        """
+        self.sql = sql
+        self.filtered = filtered
+        self.plan = []
+        self.problems = []
+
+    def to_dict(self):
+        """Return the check as a dictionary for JSON output."""
+        return { "sql": self.sql, "filtered": self.filtered, "problems": self.problems,
+                 "error": self.error, "plan": self.plan }
+
+
+class ProcedureCheck:
+    """The checks of the statements of a procedure."""
+    name = None
+    loaded = False
+    error = None
+    statements = None
+
+    def __init__(self, name):
+        """Constructor.
+
+        Args:
+           name (string):  name of the procedure
+        """
+        self.name = name
+        self.statements = []
+
+    def has_problems(self):
+        """Return True if the procedure failed to load or has a flagged statement."""
+        return bool(self.error) or any(statement.problems or statement.error
+                                       for statement in self.statements)
+
+    def to_dict(self):
+        """Return the check as a dictionary for JSON output."""
+        return { "procedure": self.name, "loaded": self.loaded, "error": self.error,
+                 "statements": [ statement.to_dict() for statement in self.statements ] }
+
+
+def split_parameters(declaration):
+    """Return the parameters of a CREATE PROCEDURE declaration.
+
+    Args:
+       declaration (string):  declaration from sgdeploy.split_create_statement()
+
+    Returns:
+       (list): (name, type) tuples
+    """
+    text = declaration[declaration.find("(") + 1:declaration.rfind(")")]
+
+    parts = []
+    depth = 0
+    quoted = False
+    start = 0
+    for position, char in enumerate(text):
+        if char == "'":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(text[start:position])
+            start = position + 1
+    parts.append(text[start:])
+
+    parameters = []
+    for part in parts:
+        words = part.split(maxsplit=1)
+        if len(words) == 2:
+            parameters.append((words[0], words[1]))
+
+    return parameters
+
+def get_literal(type_string):
+    """Return a representative literal for a parameter of type `type_string`."""
+    base = re.split(r"[\s(]", type_string.strip(), maxsplit=1)[0].lower()
+
+    if base in numeric_types:
+        return "1"
+    if base in literal_values:
+        return literal_values[base]
+    if base in ("enum", "set"):
+        match = re_quoted.search(type_string)
+        if match:
+            return f"'{match.group(1)}'"
+
+    return "'a'"
+
+def iter_body_statements(body):
+    """Yield the SELECT, UPDATE and DELETE statements of a procedure body.
+
+    SELECT statements without a FROM clause, which read no table, are
+    left out.
+
+    Args:
+       body (string):  procedure body, from BEGIN to END
+
+    Returns:
+       (iterator): statement strings
+    """
+    for chunk in body.split(";"):
+        position = 0
+        while True:
+            match = re_control.match(chunk, position)
+            if match is None or match.end() == position:
+                break
+            position = match.end()
+
+        chunk = chunk[position:].strip()
+        match = re_verb.match(chunk)
+        if match is None:
+            continue
+        if match.group(1).upper() == "SELECT" and re_from.search(chunk) is None:
+            continue
+
+        yield chunk
+
+def bind_parameters(statement, parameters):
+    """Replace the parameters of a statement with representative literals.
+
+    Args:
+       statement (string):  statement of a procedure body
+       parameters (list):   (name, type) tuples from split_parameters()
+
+    Returns:
+       (string): the statement with literals for its parameters
+    """
+    if len(parameters) == 0:
+        return statement
+
+    literals = { name: get_literal(type_string) for name, type_string in parameters }
+    names = sorted(literals, key=len, reverse=True)
+    pattern = re.compile(r"(?<![.\w@])(" + "|".join(re.escape(name) for name in names) + r")\b")
+    return pattern.sub(lambda match: literals[match.group(1)], statement)
+
+def find_problems(plan, filtered):
+    """Return the problems of an EXPLAIN result.
+
+    Args:
+       plan (list):         EXPLAIN rows as dictionaries
+       filtered (boolean):  False if the statement has no WHERE clause, so
+                            that it is expected to read every row
+
+    Returns:
+       (list): problem dictionaries, with the problem name, table, access
+               type, estimated rows, and Extra value of the plan row
+    """
+    problems = []
+    for row in plan:
+        extra = row.get("Extra") or ""
+        names = []
+        if filtered and row.get("type") == "ALL":
+            names.append("full_scan")
+        if "Using filesort" in extra:
+            names.append("filesort")
+        if "Using temporary" in extra:
+            names.append("temporary")
+
+        for name in names:
+            problems.append({ "problem": name, "table": row.get("table"),
+                              "type": row.get("type"), "rows": row.get("rows"),
+                              "extra": extra })
+
+    return problems
+
+def explain_statement(conn, check):
+    """Fill in the plan and problems of a StatementCheck.
+
+    Args:
+       conn (object):  open mysql connection using the checked database
+       check (object): the StatementCheck
+
+    Returns:
+       None
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"EXPLAIN {check.sql}")
+            check.plan = [ dict(row) for row in cur.fetchall() ]
+    except Exception as err:   #pylint: disable=broad-except
+        check.error = str(err)
+        return
+
+    check.problems = find_problems(check.plan, check.filtered)
+
+def load_procedure(conn, name, statement):
+    """Create a procedure in the connection's current database.
+
+    Returns:
+       (string): the reason the procedure could not be created, or None
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP PROCEDURE IF EXISTS {name}")
+            cur.execute(statement)
+    except Exception as err:   #pylint: disable=broad-except
+        return str(err)
+
+    return None
+
+def get_database_exists(conn, database):
+    """Return True if the server has a database named `database`."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT SCHEMA_NAME FROM information_schema.SCHEMATA "
+                    f"WHERE SCHEMA_NAME = '{database}'")
+        return len(cur.fetchall()) > 0
+
+def get_scratch_error(conn, database, scratch):
+    """Return the reason `scratch` can't be the scratch database, or None.
+
+    Args:
+       conn (object):      open mysql connection
+       database (string):  database whose tables the statements read
+       scratch (string):   database in which the procedures are created
+
+    Returns:
+       (string): the reason, or None
+    """
+    if scratch.lower() == database.lower():
+        return f"The scratch database can't be the checked database '{database}'"
+
+    if get_database_exists(conn, scratch):
+        return (f"The scratch database '{scratch}' already exists, "
+                "choose a name that isn't in use with --scratch-database")
+
+    return None
+
+def check_scripts(conn, database, scratch, texts, delimiter):
+    """Load generated scripts into a scratch database and EXPLAIN their statements.
+
+    The scratch database is created, and dropped with the procedures
+    when the checks are done.
+
+    Args:
+       conn (object):      open mysql connection
+       database (string):  database whose tables the statements read
+       scratch (string):   database in which the procedures are created
+       texts (iterable):   generated scripts
+       delimiter (string): the statement delimiter used in the scripts
+
+    Returns:
+       (list): ProcedureCheck objects, in script order
+
+    Raises:
+       ValueError: if `scratch` can't be used, see get_scratch_error()
+    """
+    error = get_scratch_error(conn, database, scratch)
+    if error is not None:
+        raise ValueError(error)
+
+    creates = []
+    for text in texts:
+        for statement in sgdeploy.split_statements(text, delimiter):
+            parts = sgdeploy.split_create_statement(statement)
+            if parts is not None:
+                creates.append((statement, parts))
+
+    checks = []
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE DATABASE {scratch}")
+
+    try:
+        conn.select_db(scratch)
+        for statement, (name, _, _) in creates:
+            check = ProcedureCheck(name)
+            check.error = load_procedure(conn, name, statement)
+            check.loaded = check.error is None
+            checks.append(check)
+
+        conn.select_db(database)
+        for check, (_, (_, declaration, body)) in zip(checks, creates):
+            parameters = split_parameters(declaration)
+            for statement in iter_body_statements(body):
+                statement_check = StatementCheck(bind_parameters(statement, parameters),
+                                                 re_where.search(statement) is not None)
+                explain_statement(conn, statement_check)
+                check.statements.append(statement_check)
+
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP DATABASE IF EXISTS {scratch}")
+        conn.select_db("information_schema")
+
+    return checks
+
+def print_report(checks, report_format, file):
+    """Print the checks as "text" or "json" to `file`."""
+    if report_format == "json":
+        report = { "procedures": [ check.to_dict() for check in checks ],
+                   "flagged": sum(1 for check in checks if check.has_problems()) }
+        print(json.dumps(report, indent=1), file=file)
+        return
+
+    for check in checks:
+        if check.error:
+            print(f"{check.name}: failed to load, {check.error}", file=file)
+        elif not check.has_problems():
+            print(f"{check.name}: ok", file=file)
+
+        for number, statement in enumerate(check.statements, start=1):
+            if statement.error:
+                print(f"{check.name} #{number}: EXPLAIN failed, {statement.error}", file=file)
+            for problem in statement.problems:
+                print(f"{check.name} #{number}: {problem['problem']} of {problem['table']} "
+                      f"(type {problem['type']}, {problem['rows']} rows"
+                      + (f", {problem['extra']})" if problem["extra"] else ")"), file=file)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+
+"""Manifest of the per-table script files written to an output directory.
+
+The manifest records a fingerprint for each table and the script files
+written for the table.  The fingerprint is a hash of the table's column
+metadata, the options that control the generated code, and the source of
+the generator modules, so a table's script files only need to be
+rewritten when its fingerprint changes.
+"""
+
+import hashlib
+import json
+import os
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+from sgsink import write_file
+#pylint: enable=import-error
+
+MANIFEST_NAME = ".schemagen-manifest.json"
+
+_generator_signature = None
+
+
+def get_generator_signature():
+    """Return a hash of the generator's source files.
+
+    Including this value in the table fingerprints ensures that the
+    script files are regenerated after the generator is changed.
+    """
+    #pylint: disable=global-statement
+    global _generator_signature
+
+    if _generator_signature is None:
+        digest = hashlib.sha256()
+        module_dir = os.path.dirname(os.path.realpath(__file__))
+        for name in sorted(os.listdir(module_dir)):
+            if name.endswith(".py"):
+                with open(os.path.join(module_dir, name), mode="rb") as source:
+                    digest.update(source.read())
+
+        _generator_signature = digest.hexdigest()
+
+    return _generator_signature
+
+def table_fingerprint(table_fields, proc_prefix, options, split="table", details=None):
+    """Calculate the fingerprint of a table's generated script.
+
+    Args:
+       table_fields (list):  column dictionaries of the table
+       proc_prefix (string): prefix for names of the generated procedures
+       options (dictionary): script options, see sgtables.get_script_options()
+       split (string):       "table" or "procedure", the files written
+                             for the table
+       details (dictionary, optional): table details that affect the
+                             generated code, see
+                             sgtables.get_fingerprint_details()
+
+    Returns:
+       (string): hexadecimal hash value
+    """
+    content = [ get_generator_signature(), proc_prefix, options, split, table_fields ]
+    if details is not None:
+        content.append(details)
+    text = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Manifest:
+    """Fingerprints and files of the table scripts in an output directory."""
+    directory = None
+    fingerprints = None
+    files = None
+
+    def __init__(self, directory):
+        """Constructor, reads the manifest file in `directory` if it exists.
+
+        Args:
+           directory (string): the output directory, which will be created
+                               if it doesn't already exist
+        """
+        self.directory = directory
+        self.fingerprints = {}
+        self.files = {}
+
+        os.makedirs(directory, exist_ok=True)
+
+        try:
+            with open(self.get_manifest_path(), mode="rt", encoding="utf-8") as manfile:
+                data = json.load(manfile)
+                self.fingerprints = data["fingerprints"]
+                self.files = data["files"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def get_manifest_path(self):
+        """Return the path of the manifest file."""
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def is_current(self, table, fingerprint):
+        """Test if the script files of `table` exist and match `fingerprint`."""
+        if self.fingerprints.get(table) != fingerprint:
+            return False
+
+        for name in self.files.get(table, []):
+            if not os.path.exists(os.path.join(self.directory, name)):
+                return False
+
+        return True
+
+    def remove_files(self, names):
+        """Delete files, given by paths relative to the output directory,
+        and the subdirectories they leave empty."""
+        for name in names:
+            try:
+                os.remove(os.path.join(self.directory, name))
+                subdir = os.path.dirname(name)
+                if subdir:
+                    os.rmdir(os.path.join(self.directory, subdir))
+            except OSError:
+                pass
+
+    def record_table(self, table, fingerprint, files):
+        """Record the fingerprint and written files of `table`.
+
+        Files previously written for the table that are not among
+        `files` are deleted.
+        """
+        self.remove_files(name for name in self.files.get(table, []) if name not in files)
+        self.fingerprints[table] = fingerprint
+        self.files[table] = files
+
+    def remove_table(self, table):
+        """Remove the script files and fingerprint of a table."""
+        self.remove_files(self.files.pop(table, []))
+        self.fingerprints.pop(table, None)
+
+    def get_tables(self):
+        """Return the names of the tables in the manifest."""
+        return list(self.fingerprints)
+
+    def save(self):
+        """Write the manifest file."""
+        data = { "fingerprints": self.fingerprints, "files": self.files }
+        write_file(self.get_manifest_path(), json.dumps(data, sort_keys=True, indent=1))
@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+
+"""Compact model of a table and its columns, built once per table.
+
+The information_schema.COLUMNS dictionaries are converted into Column
+objects whose flags and parameter type strings are calculated once, and
+a TableModel that indexes the columns by name and resolves the primary
+key.  The procedure generators share the model, so generating several
+procedures for a table doesn't repeat the scans of the column list.
+"""
+
+import re
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+import sgscripts
+#pylint: enable=import-error
+
+# Default page sizes of paginated procedures, as (table rows limit, page
+# size) pairs: small tables are read in a single page, larger tables in
+# pages that keep each call short.  Sizes are chosen from a few steps so
+# that the generated code doesn't change with every estimate of the rows.
+page_size_steps = [ (1000, 1000), (100000, 500), (10000000, 200) ]
+page_size_largest = 100
+page_size_unknown = 200
+
+# DATA_TYPE values of large columns, which are stored off-page and are
+# left out of list results unless a Projection includes them:
+lob_data_types = { "text", "mediumtext", "longtext", "blob", "mediumblob", "longblob",
+                   "json" }
+
+# Identifiers of a partitioning expression, quoted or bare:
+re_identifier = re.compile(r"`((?:[^`]|``)+)`|([A-Za-z_][A-Za-z0-9_$]*)")
+
+
+class Column:
+    """A table column with precalculated attributes.
+
+    Indexing a Column with an information_schema.COLUMNS field name
+    returns the value of the field, so a Column can be used where a
+    column dictionary is expected.
+    """
+    __slots__ = ( "field", "name", "is_primary", "is_auto_increment",
+                  "is_unsigned", "prohibits_nulls", "is_lob", "param_types" )
+
+    def __init__(self, field, name=None):
+        """Constructor.
+
+        Args:
+           field (dictionary): information_schema.COLUMNS record of the column
+           name (string, optional): name to use instead of the record's COLUMN_NAME,
+                               used for `confirm_` parameters.
+        """
+        self.field = field
+        self.name = name if name is not None else field["COLUMN_NAME"]
+        self.is_primary = sgscripts.field_is_primary_key(field)
+        self.is_auto_increment = sgscripts.field_is_auto_increment(field)
+        self.is_unsigned = sgscripts.field_is_unsigned(field)
+        self.prohibits_nulls = sgscripts.field_prohibits_nulls(field)
+        self.is_lob = field["DATA_TYPE"].lower() in lob_data_types
+        self.param_types = {}
+
+    def __getitem__(self, key):
+        """Return a COLUMNS field value, with COLUMN_NAME giving the column's name."""
+        if key == "COLUMN_NAME":
+            return self.name
+
+        return self.field[key]
+
+    def get_type_string(self, keep_not_null=False, enum_as_varchar=False):
+        """Return the parameter type string of the column.
+
+        See sgscripts.get_type_string_from_field() for the arguments.  The
+        string is calculated only once for each combination of arguments.
+        """
+        key = (keep_not_null, enum_as_varchar)
+        type_string = self.param_types.get(key)
+        if type_string is None:
+            type_string = sgscripts.get_type_string_from_field(self.field,
+                                                               keep_not_null=keep_not_null,
+                                                               enum_as_varchar=enum_as_varchar)
+            self.param_types[key] = type_string
+
+        return type_string
+
+    def renamed(self, name):
+        """Return a copy of the column with a different name."""
+        column = Column.__new__(Column)
+        column.field = self.field
+        column.name = name
+        column.is_primary = self.is_primary
+        column.is_auto_increment = self.is_auto_increment
+        column.is_unsigned = self.is_unsigned
+        column.prohibits_nulls = self.prohibits_nulls
+        column.is_lob = self.is_lob
+        column.param_types = self.param_types
+        return column
+
+
+class Projection:
+    """Rules that select the columns of list results.
+
+    Columns named in `include` are listed and columns named in `exclude`
+    are not, a name being either COLUMN for a column of any table or
+    TABLE.COLUMN.  Other columns are listed unless they are large
+    (see `lob_data_types`).
+    """
+    __slots__ = ( "include", "exclude" )
+
+    def __init__(self, include=None, exclude=None):
+        """Constructor.
+
+        Args:
+           include (string, optional): comma-separated names of columns to list
+           exclude (string, optional): comma-separated names of columns not to list
+        """
+        self.include = parse_column_names(include)
+        self.exclude = parse_column_names(exclude)
+
+    def is_listed(self, table, column):
+        """Return True if `column` of `table` belongs in list results."""
+        qualified = f"{table}.{column.name}"
+        if qualified in self.include:
+            return True
+        if qualified in self.exclude:
+            return False
+        if column.name in self.include:
+            return True
+        if column.name in self.exclude:
+            return False
+
+        return not column.is_lob
+
+
+class ChildTable:
+    """A table that refers to another table with a foreign key.
+
+    The referring table's model has the same projection as the referenced
+    table's, so its list columns are selected with the same rules.
+    """
+    __slots__ = ( "name", "model", "columns", "referenced", "joined" )
+
+    def __init__(self, name, model, columns, referenced, joined):
+        """Constructor.
+
+        Args:
+           name (string):      name of the foreign key constraint
+           model (object):     TableModel of the referring table
+           columns (list):     Column objects of the foreign key, in key order
+           referenced (list):  referenced Column objects of the parent table,
+                               in key order
+           joined (boolean):   True if the key refers to columns other than the
+                               parent's primary key, so the rows are found
+                               through a join with the parent row
+        """
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.referenced = referenced
+        self.joined = joined
+
+
+def get_partition_columns(partitions, by_name, primary_keys):
+    """Return the columns of the partitioning expressions of a table.
+
+    Args:
+       partitions (dictionary): the table's partitioning, as collected by
+                                sgdb.collect_table_partitions(), or None
+       by_name (dictionary):    column name -> Column of the table
+       primary_keys (list):     Column objects of the primary key, which
+                                partition a table by KEY() without columns
+
+    Returns:
+       (list): Column objects, in the order of the expressions
+    """
+    if not partitions:
+        return []
+
+    columns = []
+    for method_key, expression_key in (("method", "expression"),
+                                       ("subpartition_method", "subpartition_expression")):
+        method = partitions.get(method_key) or ""
+        expression = partitions.get(expression_key) or ""
+        if method.endswith("KEY") and expression.strip() == "":
+            names = [ column.name for column in primary_keys ]
+        else:
+            identifiers = re_identifier.findall(expression)
+            # Quoted identifiers are the columns when the server quotes them,
+            # leaving out function names like YEAR or TO_DAYS:
+            if "`" in expression:
+                names = [ quoted.replace("``", "`") for quoted, _ in identifiers if quoted ]
+            else:
+                names = [ bare for _, bare in identifiers if bare ]
+
+        for name in names:
+            column = by_name.get(name)
+            if column is not None and column not in columns:
+                columns.append(column)
+
+    return columns
+
+
+class TableModel:
+    """A table's columns with a name index and the resolved primary key.
+
+    The primary key may have several columns, which are listed in
+    `primary_keys` in the order of the PRIMARY index.  `primary_key` is
+    the first of them, or None if the table has no primary key.
+
+    The server requires the primary key of a partitioned table to
+    include every column of the partitioning, so `partition_columns` is
+    a subset of `primary_keys` for a partitioned table with a primary key.
+    """
+    __slots__ = ( "name", "columns", "by_name", "primary_key", "primary_keys",
+                  "non_primary", "list_columns", "unlisted", "table_rows", "page_size",
+                  "indexes", "unique_keys", "children", "partitioning", "partition_columns" )
+
+    def __init__(self, name, fields, table_rows=None, indexes=None, projection=None,
+                 children=None, unique_keys=None, partitions=None):
+        """Constructor.
+
+        Args:
+           name (string):  name of the table
+           fields (list):  information_schema.COLUMNS records, as collected
+                           by sgdb.collect_table_columns(), or Column objects
+           table_rows (integer, optional): estimated number of rows, from
+                           information_schema.TABLES, None if unknown
+           indexes (dictionary, optional): index name -> column names of the
+                           table's indexes, as collected by
+                           sgdb.collect_table_indexes().  The PRIMARY index
+                           orders the primary key columns, which otherwise
+                           follow the column order.
+           projection (object, optional): Projection that selects the
+                           `list_columns`, by default leaving out large columns
+           children (list, optional): foreign keys that refer to the table,
+                           as collected by sgdb.collect_table_children()
+           unique_keys (dictionary, optional): index name -> column names of
+                           the table's unique indexes, as collected by
+                           sgdb.collect_table_unique_keys().  Without them,
+                           each column whose COLUMN_KEY is UNI is taken as
+                           a unique key.
+           partitions (dictionary, optional): the table's partitioning, as
+                           collected by sgdb.collect_table_partitions(),
+                           None if the table isn't partitioned
+        """
+        self.name = name
+        self.table_rows = table_rows
+        self.page_size = get_default_page_size(table_rows)
+        self.columns = [ field if isinstance(field, Column) else Column(field)
+                         for field in fields ]
+        self.by_name = { column.name: column for column in self.columns }
+        self.primary_keys = []
+        self.non_primary = []
+
+        for column in self.columns:
+            if column.is_primary:
+                self.primary_keys.append(column)
+            else:
+                self.non_primary.append(column)
+
+        # (index name, list of Column) tuples of the secondary indexes,
+        # leaving out any index that names a column the table doesn't have:
+        self.indexes = []
+        for index_name, column_names in (indexes or {}).items():
+            index_columns = [ self.by_name.get(column_name) for column_name in column_names ]
+            if None in index_columns:
+                continue
+
+            if index_name != "PRIMARY":
+                self.indexes.append((index_name, index_columns))
+            elif len(index_columns) == len(self.primary_keys):
+                self.primary_keys = index_columns
+
+        self.primary_key = self.primary_keys[0] if self.primary_keys else None
+
+        # (index name, list of Column) tuples of the unique keys other than
+        # the primary key:
+        if unique_keys is None:
+            self.unique_keys = [ (column.name, [ column ]) for column in self.columns
+                                 if column["COLUMN_KEY"] == "UNI" ]
+        else:
+            self.unique_keys = []
+            for index_name, column_names in unique_keys.items():
+                index_columns = [ self.by_name.get(column_name) for column_name in column_names ]
+                if index_name != "PRIMARY" and None not in index_columns:
+                    self.unique_keys.append((index_name, index_columns))
+
+        # Partitioning method, like RANGE or HASH, or None, and the columns
+        # that statements must match for the server to prune partitions:
+        self.partitioning = partitions["method"] if partitions else None
+        self.partition_columns = get_partition_columns(partitions, self.by_name,
+                                                       self.primary_keys)
+
+        # Columns of list results, and the non-key columns left out of them,
+        # the primary key columns always being listed:
+        projection = projection or default_projection
+        self.list_columns = []
+        self.unlisted = []
+        for column in self.columns:
+            if column.is_primary or projection.is_listed(name, column):
+                self.list_columns.append(column)
+            else:
+                self.unlisted.append(column)
+
+        # ChildTable objects of the foreign keys that refer to the table,
+        # leaving out any key that names a column either table doesn't have:
+        self.children = []
+        for key in children or []:
+            child = TableModel(key["table"], key["fields"], projection=projection)
+            columns = [ child.by_name.get(column_name) for column_name in key["columns"] ]
+            referenced = [ self.by_name.get(column_name) for column_name in key["referenced"] ]
+            if None in columns or None in referenced:
+                continue
+
+            joined = [ column.name for column in referenced ] != \
+                     [ column.name for column in self.primary_keys ]
+            self.children.append(ChildTable(key["name"], child, columns, referenced, joined))
+
+    def __iter__(self):
+        """Iterate over the columns."""
+        return iter(self.columns)
+
+    def __len__(self):
+        """Return the number of columns."""
+        return len(self.columns)
+
+    def get_column(self, name):
+        """Return the column named `name`, or None."""
+        return self.by_name.get(name)
+
+    def get_confirm_columns(self, field_names):
+        """Return `confirm_` prefixed copies of the columns named in `field_names`.
+
+        Args:
+           field_names (string): comma-separated list of column names, or None
+
+        Returns:
+           (list): Column objects, skipping names that aren't in the table
+        """
+        confirm_columns = []
+        if field_names is not None:
+            for field_name in field_names.split(','):
+                column = self.by_name.get(field_name.strip())
+                if column is not None:
+                    confirm_columns.append(column.renamed("confirm_" + column.name))
+
+        return confirm_columns
+
+
+def parse_column_names(names):
+    """Return the set of names in a comma-separated list, None giving an empty set."""
+    if names is None:
+        return frozenset()
+
+    return frozenset(name.strip() for name in names.split(",") if name.strip())
+
+default_projection = Projection()
+
+def get_default_page_size(table_rows):
+    """Return the default page size of a table's paginated procedures.
+
+    Args:
+       table_rows (integer): estimated number of rows, None if unknown
+
+    Returns:
+       (integer): rows per page
+    """
+    if table_rows is None:
+        return page_size_unknown
+
+    for rows_limit, page_size in page_size_steps:
+        if table_rows <= rows_limit:
+            return page_size
+
+    return page_size_largest
+
+def as_table_model(fields, table_name):
+    """Return `fields` as a TableModel, building one if necessary.
+
+    Args:
+       fields (list or object): column dictionaries, or a TableModel
+       table_name (string):     name of the table
+
+    Returns:
+       (object): a TableModel
+    """
+    if isinstance(fields, TableModel):
+        return fields
+
+    return TableModel(table_name, fields)
+
+def as_columns(fields):
+    """Return a list of Column objects from a list of dictionaries or Columns."""
+    return [ field if isinstance(field, Column) else Column(field) for field in fields ]
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+
+"""Output sinks that receive the generated scripts.
+
+A sink is any object with a `write(text)` method.  The sinks in this
+module collect the many small fragments written by the generator and
+write them out in bulk:
+
+   BufferSink:    keeps the text in memory
+   StreamSink:    writes each unit of output to a stream in a single write
+   FileSink:      a StreamSink that opens and owns a file
+   DirectorySink: writes each unit of output to its own file
+
+A unit of output is the text written between calls to `begin(name)`
+and `end()`.  The names are used by DirectorySink as file names.
+"""
+
+import os
+import sys
+
+
+def write_file(path, text):
+    """Replace the contents of a file in a single write.
+
+    The text is written to a temporary file that then replaces `path`
+    so a reader will never see a partially-written file.
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, mode="wt", encoding="utf-8") as outfile:
+        outfile.write(text)
+
+    os.replace(temp_path, path)
+
+
+class BufferSink:
+    """Sink that keeps the written text in memory.
+
+    The positions of named units are recorded so the text of each unit
+    can be retrieved separately with get_sections().
+    """
+    parts = None
+    length = 0
+    sections = None
+    section_name = None
+    section_start = 0
+
+    def __init__(self):
+        """Constructor for an empty buffer."""
+        self.clear()
+
+    def write(self, text):
+        """Append `text` to the buffer."""
+        self.parts.append(text)
+        self.length += len(text)
+
+    def begin(self, name):
+        """Mark the start of a named unit of output."""
+        self.section_name = name
+        self.section_start = self.length
+
+    def end(self):
+        """Mark the end of the current unit of output."""
+        if self.section_name is not None:
+            self.sections.append((self.section_name, self.section_start, self.length))
+            self.section_name = None
+
+    def getvalue(self):
+        """Return all the text written to the buffer."""
+        text = "".join(self.parts)
+        self.parts = [ text ]
+        return text
+
+    def get_sections(self):
+        """Return a list of (name, start, end) tuples locating the named
+        units of output in the text returned by getvalue()."""
+        return self.sections[:]
+
+    def clear(self):
+        """Discard the buffer contents."""
+        self.parts = []
+        self.length = 0
+        self.sections = []
+        self.section_name = None
+        self.section_start = 0
+
+    def close(self):
+        """Nothing to release for a buffer."""
+
+
+class StreamSink(BufferSink):
+    """Sink that writes each unit of output to a stream in a single write."""
+    stream = None
+
+    def __init__(self, stream=None):
+        """Constructor.
+
+        Args:
+           stream (object, optional): file object to receive the output,
+                                      defaulting to sys.stdout
+        """
+        super().__init__()
+        self.stream = stream if stream is not None else sys.stdout
+
+    def end(self):
+        """End the current unit of output and write it to the stream."""
+        super().end()
+        self.flush()
+
+    def flush(self):
+        """Write any buffered text to the stream."""
+        if self.length > 0:
+            self.stream.write(self.getvalue())
+            self.clear()
+
+        self.stream.flush()
+
+    def close(self):
+        """Write any remaining text."""
+        self.flush()
+
+
+class FileSink(StreamSink):
+    """StreamSink that writes to a file that it opens and closes."""
+
+    def __init__(self, path):
+        """Constructor, creates or truncates the file at `path`."""
+        #pylint: disable=consider-using-with
+        super().__init__(open(path, mode="wt", encoding="utf-8"))
+
+    def close(self):
+        """Write any remaining text and close the file."""
+        super().close()
+        self.stream.close()
+
+
+class DirectorySink(BufferSink):
+    """Sink that writes each named unit of output to its own file.
+
+    The file of a unit is named by the unit's name with an added
+    extension.  A name may include subdirectories, which will be
+    created as needed.  Text written outside of a unit is discarded.
+    """
+    directory = None
+    extension = ".sql"
+    written = None
+
+    def __init__(self, directory, extension=".sql"):
+        """Constructor.
+
+        Args:
+           directory (string): directory that will contain the files,
+                               created if it doesn't exist
+           extension (string): file name extension for each file
+        """
+        super().__init__()
+        self.directory = directory
+        self.extension = extension
+        self.written = []
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, name):
+        """Return the path of the file for unit `name`."""
+        return os.path.join(self.directory, name + self.extension)
+
+    def begin(self, name):
+        """Start a new file."""
+        self.clear()
+        super().begin(name)
+
+    def end(self):
+        """Write the current unit of output to its file with a single write."""
+        if self.section_name is not None:
+            path = self.get_path(self.section_name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_file(path, self.getvalue())
+            self.written.append(os.path.relpath(path, self.directory))
+
+        self.clear()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+
+"""Saving and reading schema snapshot files.
+
+A snapshot holds everything the generator reads from information_schema:
+database names, and for each database the table names, procedure names,
+table columns, and the table details some procedures use, like indexes
+and partitioning.  Scripts and lists can then be produced from the
+snapshot without a database server.
+
+The module-level functions that take a `snapshot` argument mirror the
+same-named functions in sgdb, so a Snapshot object can be used in place
+of an open connection with this module in place of sgdb.
+
+The file is compact JSON.  Column rows are saved as lists ordered by
+`column_names` rather than as dictionaries to keep the file small and
+quick to parse.
+"""
+
+import json
+import sys
+from datetime import datetime  # for recording snapshot date
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+import sgdb
+#pylint: enable=import-error
+
+SNAPSHOT_FORMAT = "schemagen-snapshot"
+# Version 2 added the estimated table rows, indexes, unique keys,
+# partitioning and foreign keys.  Version 1 snapshots are still read,
+# with a warning for each of these details that a procedure needs.
+SNAPSHOT_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+
+# Schema entries holding details that older snapshots lack
+detail_names = {
+    "table_rows":   "estimated table rows",
+    "indexes":      "indexes",
+    "unique_keys":  "unique keys",
+    "partitions":   "partitioning",
+    "foreign_keys": "foreign keys",
+}
+
+# Databases that hold no application tables
+system_databases = [ "information_schema", "mysql", "performance_schema", "sys" ]
+
+
+class Snapshot:
+    """Contents of a snapshot file."""
+    host = None
+    created = None
+    databases = None
+    column_names = None
+    schemas = None
+    path = None
+    warned = None
+
+    def __init__(self, data, path=None):
+        """Constructor from the decoded contents of a snapshot file.
+
+        Args:
+           data (dictionary): decoded snapshot file
+           path (string, optional): path of the file, for messages
+
+        Raises:
+           ValueError if `data` is not a readable snapshot
+        """
+        if data.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError("not a schemagen snapshot")
+        if data.get("version") not in SUPPORTED_VERSIONS:
+            raise ValueError(f"unsupported snapshot version {data.get('version')}")
+
+        self.host = data["host"]
+        self.created = data["created"]
+        self.databases = data["databases"]
+        self.column_names = data["column_names"]
+        self.schemas = data["schemas"]
+        self.path = path
+        self.warned = set()
+
+    def get_schema(self, database):
+        """Return the saved contents of `database`, or None if not saved."""
+        return self.schemas.get(database)
+
+    def get_table_rows(self, database, table):
+        """Return the saved column rows (as lists) of a table, or None."""
+        schema = self.get_schema(database)
+        if schema:
+            return schema["columns"].get(table)
+
+        return None
+
+    def get_detail(self, database, name):
+        """Return a saved detail of `database`, see `detail_names`.
+
+        A snapshot saved before the detail was recorded has none, which is
+        reported once on stderr, since the generated code will differ from
+        code generated from the database.
+
+        Returns:
+           (dictionary): table name -> detail, or None if `database`
+                         is not saved
+        """
+        schema = self.get_schema(database)
+        if schema is None:
+            return None
+
+        if name not in schema:
+            if (database, name) not in self.warned:
+                self.warned.add((database, name))
+                label = f"Snapshot '{self.path}'" if self.path else "The snapshot"
+                print(f"{label} has no {detail_names[name]} of database '{database}', "
+                      "dump it again to include them.", file=sys.stderr)
+            return {}
+
+        return schema[name]
+
+    def make_column(self, row):
+        """Convert a saved column row into a column dictionary."""
+        return dict(zip(self.column_names, row))
+
+    def close(self):
+        """Allows a Snapshot to be closed like a connection."""
+
+
+def load_snapshot(path):
+    """Read a snapshot file.
+
+    Args:
+       path (string): path to the snapshot file
+
+    Returns:
+       (object): a Snapshot instance
+    """
+    with open(path, mode="rt", encoding="utf-8") as snapfile:
+        return Snapshot(json.load(snapfile), path)
+
+def collect_names(conn, query, column_name):
+    """Return the values of a single column of the rows of a query."""
+    name_list = None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            name_list = []
+            rows = cur.fetchall()
+            for row in rows:
+                name_list.append(row[column_name])
+
+    except BaseException as err:
+        print(f"Unexpected {err=}, {type(err)=}")
+        raise
+
+    return name_list
+
+def collect_schema(conn, database):
+    """Collect the snapshot contents of a single database.
+
+    Args:
+       conn (object):     open mysql connection
+       database (string): name of the database
+
+    Returns:
+       (dictionary): the table names, procedure names, table columns,
+                     estimated table rows, indexes, unique keys, partitioning
+                     and foreign keys
+    """
+    tables = collect_names(conn, sgdb.prep_query_tables_list(database), "TABLE_NAME")
+    procedures = collect_names(conn,
+                               sgdb.prep_query_procedures_list(database),
+                               "ROUTINE_NAME")
+
+    columns = {}
+    for table, table_fields in sgdb.collect_database_columns(conn, database).items():
+        columns[table] = [ [ field[name] for name in sgdb.column_field_names ]
+                           for field in table_fields ]
+
+    return { "tables": tables, "procedures": procedures, "columns": columns,
+             "table_rows": sgdb.collect_table_rows(conn, database),
+             "indexes": sgdb.collect_table_indexes(conn, database),
+             "unique_keys": sgdb.collect_table_unique_keys(conn, database),
+             "partitions": sgdb.collect_table_partitions(conn, database),
+             "foreign_keys": sgdb.collect_foreign_keys(conn, database) }
+
+def collect_snapshot(conn, host, database=None):
+    """Collect the contents of a snapshot.
+
+    Args:
+       conn (object):               open mysql connection
+       host (string):               name of the host, recorded in the snapshot
+       database (string, optional): the database to save, or None to save
+                                    every database except the system databases
+
+    Returns:
+       (dictionary): snapshot contents, as saved in a snapshot file
+    """
+    databases = sgdb.get_list_of_database_names(conn)
+
+    if database is None:
+        saved = [ name for name in databases if name not in system_databases ]
+    else:
+        saved = [ database ]
+
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created": str(datetime.now()),
+        "host": host,
+        "databases": databases,
+        "column_names": sgdb.column_field_names,
+        "schemas": { name: collect_schema(conn, name) for name in saved }
+    }
+
+def dump_snapshot(conn, host, path, database=None):
+    """Save a snapshot file.
+
+    Args:
+       conn (object):               open mysql connection
+       host (string):               name of the host, recorded in the snapshot
+       path (string):               path of the snapshot file to write
+       database (string, optional): see collect_snapshot()
+
+    Returns:
+       None
+    """
+    data = collect_snapshot(conn, host, database)
+
+    with open(path, mode="wt", encoding="utf-8") as snapfile:
+        json.dump(data, snapfile, separators=(",", ":"))
+
+
+def collect_table_columns(snapshot, database, table):
+    """ Collect table fields from a snapshot, see sgdb.collect_table_columns()."""
+    rows = snapshot.get_table_rows(database, table)
+    if rows is None:
+        return []
+
+    return [ snapshot.make_column(row) for row in rows ]
+
+def collect_database_columns(snapshot, database, tables=None):
+    """ Collect the fields of many tables, see sgdb.collect_database_columns()."""
+    schema = snapshot.get_schema(database)
+    if schema is None:
+        return {}
+
+    columns = schema["columns"]
+    if tables is None:
+        tables = sorted(columns)
+
+    tables_dict = {}
+    for table in tables:
+        if table in columns:
+            tables_dict[table] = [ snapshot.make_column(row) for row in columns[table] ]
+
+    return tables_dict
+
+def iter_database_columns(snapshot, database, tables=None):
+    """ Stream the fields of many tables, see sgdb.iter_database_columns()."""
+    schema = snapshot.get_schema(database)
+    if schema is None:
+        return
+
+    columns = schema["columns"]
+    if tables is None:
+        tables = sorted(columns)
+
+    for table in tables:
+        if table in columns:
+            yield table, [ snapshot.make_column(row) for row in columns[table] ]
+
+def collect_table_rows(snapshot, database, tables=None):
+    """ Collect estimated row counts from a snapshot, see sgdb.collect_table_rows()."""
+    table_rows = snapshot.get_detail(database, "table_rows")
+    if table_rows is None:
+        return {}
+
+    if tables is None:
+        return dict(table_rows)
+
+    return { table: table_rows[table] for table in tables if table in table_rows }
+
+def collect_table_indexes(snapshot, database, tables=None):
+    """ Collect table indexes from a snapshot, see sgdb.collect_table_indexes()."""
+    indexes = snapshot.get_detail(database, "indexes")
+    if indexes is None:
+        return {}
+
+    if tables is None:
+        return dict(indexes)
+
+    return { table: indexes[table] for table in tables if table in indexes }
+
+def collect_table_unique_keys(snapshot, database, tables=None):
+    """ Collect the unique indexes of tables from a snapshot,
+    see sgdb.collect_table_unique_keys()."""
+    unique_keys = snapshot.get_detail(database, "unique_keys")
+    if unique_keys is None:
+        return {}
+
+    if tables is None:
+        return dict(unique_keys)
+
+    return { table: unique_keys[table] for table in tables if table in unique_keys }
+
+def collect_table_partitions(snapshot, database, tables=None):
+    """ Collect the partitioning of tables from a snapshot,
+    see sgdb.collect_table_partitions()."""
+    partitions = snapshot.get_detail(database, "partitions")
+    if partitions is None:
+        return {}
+
+    if tables is None:
+        return dict(partitions)
+
+    return { table: partitions[table] for table in tables if table in partitions }
+
+def collect_table_children(snapshot, database, tables=None):
+    """ Collect the foreign keys that refer to tables from a snapshot,
+    see sgdb.collect_table_children()."""
+    foreign_keys = snapshot.get_detail(database, "foreign_keys")
+    if foreign_keys is None:
+        return {}
+
+    if tables is not None:
+        foreign_keys = { table: foreign_keys[table] for table in tables if table in foreign_keys }
+
+    tables_columns = collect_database_columns(snapshot, database,
+                                              sgdb.get_child_table_names(foreign_keys))
+    return sgdb.make_table_children(foreign_keys, tables_columns)
+
+def get_list_of_table_names(snapshot, database):
+    """ Returns a list of tables for given database."""
+    schema = snapshot.get_schema(database)
+    return schema["tables"][:] if schema else []
+
+def get_list_of_procedure_names(snapshot, database):
+    """Returns a list of procedures for given database."""
+    print(f"[32;1mProcedures in database '{database}'[m" )
+    schema = snapshot.get_schema(database)
+    return schema["procedures"][:] if schema else []
+
+def get_list_of_table_fields(snapshot, database, table):
+    """Returns a list of field names for the given table."""
+    print(f"[32;1mFields in table '{table}' in database '{database}'[m" )
+    rows = snapshot.get_table_rows(database, table)
+    if rows is None:
+        return []
+
+    name_index = snapshot.column_names.index("COLUMN_NAME")
+    return [ row[name_index] for row in rows ]
+
+def get_list_of_database_names(snapshot):
+    """ Returns a list of database names for the snapshot's host."""
+    return snapshot.databases[:]
@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+
+"""Functions for generating the scripts of one or many tables,
+either serially or spread over a pool of worker processes.
+
+The per-table output is rendered to a string so that results from
+the worker processes can be written in table order, making a
+parallel run byte-identical to a serial run.  The rendered text
+is then written to an output sink in a single write per table or
+per procedure.
+"""
+
+import collections
+import functools
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+import sgtemplates
+from sgmodel import Projection, TableModel, get_default_page_size
+from sgscripts import SGScripter
+from sgsink import BufferSink
+#pylint: enable=import-error
+
+# Command line arguments used by the functions in this module.  Only
+# these are sent to worker processes.
+option_names = [ "script", "confirm_fields", "indent_chars", "delimiter",
+                 "max_chars", "items_per_line", "templates", "list_include",
+                 "list_exclude" ]
+
+
+def get_script_options(args):
+    """Extract from `args` the values needed to generate table scripts."""
+    return { name: args[name] for name in option_names }
+
+# Table details beyond the columns, which are only read when a requested
+# procedure kind uses them: template value or column set -> (TableModel
+# argument, name of the source function that collects the detail)
+detail_sources = {
+    "page_size": ("table_rows", "collect_table_rows"),
+    "index":     ("indexes", "collect_table_indexes"),
+    "primary":   ("indexes", "collect_table_indexes"),
+    "pk":        ("indexes", "collect_table_indexes"),
+    "children":  ("children", "collect_table_children"),
+    "upsert_key": ("unique_keys", "collect_table_unique_keys"),
+    "partition": ("partitions", "collect_table_partitions"),
+    "index_partition": ("partitions", "collect_table_partitions"),
+}
+
+# The partitioning also decides the warnings of procedures that can't
+# prune partitions, for the kinds that declare the columns they match:
+partition_detail = ("partitions", "collect_table_partitions")
+
+@functools.lru_cache(maxsize=8)
+def get_projection(include, exclude):
+    """Return the sgmodel.Projection of the --list-include and
+    --list-exclude values, made once for all the tables."""
+    return Projection(include, exclude)
+
+def get_needed_details(options):
+    """Return the table details that the requested procedure kinds use.
+
+    Returns:
+       (list): (TableModel argument, source function name) tuples,
+               see `detail_sources`
+    """
+    script_type = options["script"]
+    if script_type == "all":
+        kinds = sgtemplates.get_kind_names(all_only=True)
+    else:
+        kinds = [ script_type ]
+
+    needed = []
+    for name, detail in detail_sources.items():
+        if detail not in needed and sgtemplates.kinds_use(kinds, name):
+            needed.append(detail)
+
+    if partition_detail not in needed and sgtemplates.kinds_filter(kinds):
+        needed.append(partition_detail)
+
+    return needed
+
+def get_fingerprint_details(details):
+    """Return the parts of a table's details that affect its generated code,
+    for sgmanifest.table_fingerprint()."""
+    if details is None:
+        return None
+
+    fingerprinted = dict(details)
+    if "table_rows" in fingerprinted:
+        fingerprinted["table_rows"] = get_default_page_size(fingerprinted["table_rows"])
+
+    return fingerprinted
+
+def make_scripter(options, sink=None):
+    """Create an SGScripter configured by the output formatting options.
+
+    Procedure kinds read from --template files are registered first, which
+    a worker process needs, not having inherited the registrations.
+    """
+    sgtemplates.register_template_texts(options.get("templates"))
+    return SGScripter(tabstop=options["indent_chars"],
+                      delimiter=options["delimiter"],
+                      printer_limit=options["max_chars"],
+                      printer_items_per_line=options["items_per_line"],
+                      sink=sink)
+
+def iter_kind_procedures(kind, proc_name, model):
+    """Yield the (procedure name, index columns) of each procedure of a kind,
+    one for each secondary index of the table for a per-index kind."""
+    if sgtemplates.get_kind(kind).per_index:
+        for index_name, index_columns in model.indexes:
+            yield proc_name + index_name, index_columns
+    else:
+        yield proc_name, None
+
+def print_table_script(scripter, table, table_fields, proc_prefix, options, details=None):
+    """Print the requested script(s) for a single table.
+
+    The code of each procedure is written to the scripter's sink as a
+    unit of output named for the procedure.  The table's column model is
+    built once and shared by the procedure generators.
+
+    Args:
+       scripter (object):       SGScripter instance that will generate the code
+       table (string):          name of the table
+       table_fields (list):     column dictionaries of the table
+       proc_prefix (string):    prefix for names of the generated procedures
+       options (dictionary):    map of command line parameters
+       details (dictionary, optional): table details, TableModel arguments
+                                like `table_rows` and `indexes`, see
+                                get_needed_details()
+
+    Returns:
+       None
+    """
+    script_type = options["script"]
+
+    projection = get_projection(options.get("list_include"), options.get("list_exclude"))
+    model = TableModel(table, table_fields, projection=projection, **(details or {}))
+    confirm_fields = model.get_confirm_columns(options["confirm_fields"])
+
+    gen_map = scripter.get_calling_dictionary(table, proc_prefix, confirm_fields)
+
+    sink = scripter.sink
+
+    if script_type == "all":
+        kinds = sgtemplates.get_kind_names(all_only=True)
+    else:
+        kinds = [ script_type ] if gen_map.get(script_type) else []
+
+    for kind in kinds:
+        fargs = gen_map[kind]
+        for count, (proc_name, index) in enumerate(iter_kind_procedures(kind, fargs[2], model)):
+            if script_type == "all":
+                scripter.write("-- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --")
+            elif count > 0:
+                scripter.write()
+            sink.begin(proc_name)
+            warning = get_partition_warning(kind, model, proc_name, index)
+            if warning:
+                scripter.write(warning)
+            fargs[0](model, fargs[1], proc_name, *fargs[3::], index=index)
+            sink.end()
+            if script_type == "all":
+                scripter.write()
+
+def get_partition_warning(kind, model, proc_name, index=None):
+    """Return a comment warning that a procedure can't prune the partitions
+    of its table, or None.
+
+    The server reads only the partitions that hold the rows a statement
+    matches when the statement matches every partition column, see
+    sgtemplates.ProcedureKind.get_unpruned_columns().
+
+    Args:
+       kind (string):       name of the procedure kind
+       model (object):      sgmodel.TableModel of the table
+       proc_name (string):  name of the procedure
+       index (list):        index columns of a per-index kind
+
+    Returns:
+       (string): the comment, or None
+    """
+    procedure_kind = sgtemplates.get_kind(kind)
+    if procedure_kind is None:
+        return None
+
+    # No procedure is generated for a table without a primary key:
+    if model.primary_key is None and procedure_kind.uses("pk"):
+        return None
+
+    unpruned = procedure_kind.get_unpruned_columns(model, index)
+    if not unpruned:
+        return None
+
+    names = ", ".join(column.name for column in unpruned)
+    return (f"-- Warning: {proc_name} doesn't match the {model.partitioning} partition "
+            f"column(s) {names} of {model.name}, so its calls may read every partition.")
+
+def render_table_script(table, table_fields, proc_prefix, options, scripter=None,
+                        details=None):
+    """Generate the script(s) for a single table into a string.
+
+    Args:
+       table (string):          name of the table
+       table_fields (list):     column dictionaries of the table
+       proc_prefix (string):    prefix for names of the generated procedures
+       options (dictionary):    script options, see get_script_options()
+       scripter (object, optional): SGScripter with a BufferSink to use,
+                                created from `options` if omitted
+       details (dictionary, optional): see print_table_script()
+
+    Returns:
+       (tuple): the generated script text and a list of (procedure name,
+                start, end) tuples locating each procedure in the text
+    """
+    if scripter is None:
+        scripter = make_scripter(options, BufferSink())
+
+    sink = scripter.sink
+    sink.clear()
+
+    print_table_script(scripter, table, table_fields, proc_prefix, options, details)
+
+    return sink.getvalue(), sink.get_sections()
+
+def write_table_script(sink, table, text, sections, split="table", header=""):
+    """Write a table's rendered script to an output sink.
+
+    Args:
+       sink (object):     output sink, see sgsink
+       table (string):    name of the table
+       text (string):     script text from render_table_script()
+       sections (list):   procedure locations from render_table_script()
+       split (string):    "table" to write the whole script as one unit of
+                          output named for the table, "procedure" to write
+                          each procedure as a unit named table/procedure.
+       header (string):   text to precede each unit of output
+
+    Returns:
+       None
+    """
+    if split == "procedure":
+        for proc_name, start, end in sections:
+            sink.begin(f"{table}/{proc_name}")
+            sink.write(header + text[start:end])
+            sink.end()
+    else:
+        sink.begin(table)
+        sink.write(header + text)
+        sink.end()
+
+def _render_job(job):
+    """Worker process entry, `job` being a (table, fields, prefix, options,
+    details) tuple.
+
+    Returns the result of render_table_script() and the seconds it took.
+    """
+    start = time.perf_counter()
+    table, table_fields, proc_prefix, options, details = job
+    text, sections = render_table_script(table, table_fields, proc_prefix, options,
+                                         details=details)
+    return text, sections, time.perf_counter() - start
+
+def render_table_scripts(table_jobs, options, jobs=1, timings=None, details=None):
+    """Generate the scripts of many tables.
+
+    Args:
+       table_jobs (iterable): (table, table_fields, proc_prefix) tuples,
+                             either a list or an iterator that is consumed
+                             as the scripts are generated
+       options (dictionary): script options, see get_script_options()
+       jobs (integer):       number of worker processes, 1 or less to
+                             generate in the current process
+       timings (object, optional): sgtimings.Timings that records the
+                             generation time of each table
+       details (dictionary, optional): table name -> table details,
+                             see print_table_script()
+
+    Returns:
+       (iterator): (table, script text, sections) tuples in the order
+                   of `table_jobs`, see render_table_script()
+    """
+    is_list = isinstance(table_jobs, (list, tuple))
+    details = details or {}
+
+    if jobs <= 1 or (is_list and len(table_jobs) < 2):
+        scripter = make_scripter(options, BufferSink())
+        for table, table_fields, proc_prefix in table_jobs:
+            start = time.perf_counter()
+            text, sections = render_table_script(table, table_fields, proc_prefix,
+                                                 options, scripter, details.get(table))
+            if timings is not None:
+                timings.add_table(table, time.perf_counter() - start)
+            yield table, text, sections
+    elif not is_list:
+        # Streamed jobs: keep a bounded window of submitted tables so
+        # the workers stay busy without reading the whole catalog ahead:
+        window = collections.deque()
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for table, table_fields, proc_prefix in table_jobs:
+                job = (table, table_fields, proc_prefix, options, details.get(table))
+                window.append((table, executor.submit(_render_job, job)))
+                if len(window) >= jobs * 4:
+                    yield _finish_job(window.popleft(), timings)
+
+            while window:
+                yield _finish_job(window.popleft(), timings)
+    else:
+        work = [ (table, table_fields, proc_prefix, options, details.get(table))
+                 for table, table_fields, proc_prefix in table_jobs ]
+
+        # Larger chunks reduce the interprocess traffic, while leaving
+        # enough chunks to balance the load among the workers:
+        chunksize = max(1, len(work) // (jobs * 4))
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(_render_job, work, chunksize=chunksize)
+            for job, (text, sections, seconds) in zip(work, results):
+                if timings is not None:
+                    timings.add_table(job[0], seconds)
+                yield job[0], text, sections
+
+def _finish_job(submitted, timings):
+    """Wait for a submitted _render_job() and return its render_table_scripts() tuple."""
+    table, future = submitted
+    text, sections, seconds = future.result()
+    if timings is not None:
+        timings.add_table(table, seconds)
+    return table, text, sections
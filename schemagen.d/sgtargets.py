@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+
+"""Reading the schemas of many hosts and databases at the same time.
+
+A target is a named host and database, with the account used to read
+it, usually taken from a `[name]` section of schemagen.cnf.  The
+gather_targets() function reads a snapshot of every target through a
+pool of worker threads, each holding one connection at a time, so that
+at most `pool_size` connections are open and the gathering takes about
+as long as the slowest server rather than the sum of all of them.
+
+The scripts and lists of each target are then produced from its
+snapshot, as they would be with --from-snapshot.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+import sgdb
+import sgsnapshot
+#pylint: enable=import-error
+
+
+class Target:
+    """A host and database to read."""
+    name = None
+    host = None
+    user = None
+    password = None
+    database = None
+
+    def __init__(self, name, host, user, password, database):
+        """Constructor.
+
+        Args:
+           name (string):      name of the target, used to label its output
+           host (string):      host name or address
+           user (string):      account user name
+           password (string):  account password, None for a blank password
+           database (string):  name of the database to read
+        """
+        self.name = name
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+
+    def get_label(self):
+        """Return the host and database as HOST/DATABASE."""
+        return f"{self.host}/{self.database}"
+
+
+class TargetResult:
+    """Outcome of reading a target."""
+    target = None
+    snapshot = None
+    error = None
+    seconds = 0.0
+
+    def __init__(self, target, snapshot=None, error=None, seconds=0.0):
+        """Constructor.
+
+        Args:
+           target (object):             the Target that was read
+           snapshot (object, optional): sgsnapshot.Snapshot of the target,
+                                        None if it could not be read
+           error (string, optional):    reason the target could not be read
+           seconds (float):             time taken to read the target
+        """
+        self.target = target
+        self.snapshot = snapshot
+        self.error = error
+        self.seconds = seconds
+
+
+def make_targets(names, sections, defaults):
+    """Make the targets named in a --targets value.
+
+    Args:
+       names (string):        comma-separated list of schemagen.cnf section
+                              names or HOST/DATABASE values, or "all" for
+                              every section
+       sections (dictionary): schemagen.cnf sections, dictionaries of
+                              host, user, password and database values
+       defaults (dictionary): values used where a section has none, and
+                              the user and password of HOST/DATABASE targets
+
+    Returns:
+       (list): Target objects, in the order of `names`
+
+    Raises:
+       ValueError if a name is neither a section nor a HOST/DATABASE value
+    """
+    if names == "all":
+        names = list(sections)
+    else:
+        names = [ name.strip() for name in names.split(",") if name.strip() ]
+
+    targets = []
+    for name in names:
+        if name in sections:
+            values = dict(defaults)
+            values.update(sections[name])
+        elif "/" in name:
+            values = dict(defaults)
+            values["host"], values["database"] = name.split("/", maxsplit=1)
+        else:
+            raise ValueError(f"unknown target '{name}', not a schemagen.cnf section "
+                             "or HOST/DATABASE")
+
+        if not values.get("host") or not values.get("database"):
+            raise ValueError(f"target '{name}' needs a host and a database")
+
+        targets.append(Target(name, values["host"], values.get("user"),
+                              values.get("password"), values["database"]))
+
+    return targets
+
+def read_target(target):
+    """Read the snapshot of a target over its own connection.
+
+    Args:
+       target (object):  the Target to read
+
+    Returns:
+       (object): a TargetResult
+    """
+    start = time.perf_counter()
+
+    conn = sgdb.make_connection(target.host, target.user, target.password)
+    if conn is None:
+        return TargetResult(target, error="connection failed",
+                            seconds=time.perf_counter() - start)
+
+    try:
+        data = sgsnapshot.collect_snapshot(conn, target.host, target.database)
+        snapshot = sgsnapshot.Snapshot(data)
+    except Exception as err:   #pylint: disable=broad-except
+        return TargetResult(target, error=str(err), seconds=time.perf_counter() - start)
+    finally:
+        conn.close()
+
+    return TargetResult(target, snapshot, seconds=time.perf_counter() - start)
+
+def gather_targets(targets, pool_size):
+    """Read the snapshots of many targets concurrently.
+
+    Args:
+       targets (list):       Target objects
+       pool_size (integer):  maximum number of connections open at once
+
+    Returns:
+       (list): TargetResult objects, in the order of `targets`
+    """
+    if len(targets) == 0:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(pool_size, len(targets)))) as executor:
+        return list(executor.map(read_target, targets))
@@ -0,0 +1,968 @@
+#!/usr/bin/env python
+
+"""Procedure kinds defined as templates, compiled once and rendered per table.
+
+A template is procedure code with tags in braces:
+
+   {name}          a value, like {proc}, {table}, {alias}, {pk} or
+                   {list_proc}, or within a {#...} section, a value of
+                   the section's current column, like {name} or {param}
+   {*item:sets}    a list of the `item` value of each column of the
+                   `+`-separated column sets, as in {*param:primary+confirm},
+                   wrapped by a CurbedPrinter at the current column
+   {|}             marks the current column as the anchor for {>...}
+   {>TEXT}         TEXT, right-justified to end at the anchor column
+   {?name}...{/name}  section included if the value or column set is not empty
+   {!name}...{/name}  section included if the value or column set is empty
+   {#set}...{/set}    section repeated for each column of a column set
+   {#children}...{/children}  section repeated for each table that refers
+                   to the table with a foreign key, in which the values and
+                   column sets are those of the referring table
+   {{ and }}       literal braces
+
+A section tag alone on a line takes its line's newline with it.  A
+{#children} section should start a line, as its text is rendered from
+the first column.  The {tab} and {delim} values are formatting
+constants of an SGScripter, which are folded into the template's text
+when the template is bound to the scripter.  Rendering a bound template
+is then a loop over text fragments and the few values, lists, and
+sections of the template.
+
+The values, column sets, column item values, and table sets available
+to templates are registered in `value_functions`, `column_sets`,
+`item_functions`, and `table_sets`, and procedure kinds with
+register_procedure_kind(), so that new kinds can be added without
+changing SGScripter.
+"""
+
+import re
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+from curbedprinter import CurbedPrinter
+#pylint: enable=import-error
+
+# Operation codes of a compiled template:
+TEXT = 0
+VALUE = 1
+LIST = 2
+ANCHOR = 3
+RJUST = 4
+IF = 5
+UNLESS = 6
+EACH = 7
+TABLE = 8
+
+re_tag = re.compile(r"\{\{|\}\}|\{([?!#/*>|]?)([^{}]*)\}")
+
+
+class TemplateError(ValueError):
+    """Raised for a template that can't be compiled or rendered."""
+
+
+# Template values, name -> function(context):
+value_functions = {
+    "proc":      lambda context: context.proc,
+    "table":     lambda context: context.table,
+    "alias":     lambda context: context.alias,
+    "list_proc": lambda context: context.list_proc,
+    "pk":        lambda context: context.model.primary_key.name
+                                 if context.model.primary_key else "",
+    "auto_pk":   lambda context: bool(len(context.model.primary_keys) == 1
+                                      and context.model.primary_key.is_auto_increment),
+    "composite_pk": lambda context: len(context.model.primary_keys) > 1,
+    "auto_key":  lambda context: "".join(column.name for column in _auto_keys(context.model)),
+    "page_size": lambda context: context.model.page_size,
+    "parent":    lambda context: context.parent.table if context.parent else "",
+    "parent_alias": lambda context: context.parent.alias if context.parent else "",
+    "joined":    lambda context: bool(context.child and context.child.joined),
+    "upsert_key": lambda context: bool(context.model.primary_keys or context.model.unique_keys),
+}
+
+def _confirmed_columns(context):
+    """The table's columns with the confirm columns following the primary key."""
+    model = context.model
+    return model.primary_keys + context.confirm + model.non_primary
+
+def _auto_keys(model):
+    """The autonumber column of a table's primary key, as a list of at most one column."""
+    return [ column for column in model.primary_keys if column.is_auto_increment ][:1]
+
+def _upsert_columns(context):
+    """The columns an upsert sets on a duplicate key: an autonumber key,
+    to make LAST_INSERT_ID() return the key of the updated row, and the
+    other columns, or when there are none, a key column to set to itself."""
+    model = context.model
+    columns = _auto_keys(model) + model.non_primary
+    if len(columns) == 0:
+        columns = (model.primary_keys + [ column for _, key in model.unique_keys
+                                          for column in key ])[:1]
+
+    return columns
+
+def _upsert_set(column, context):
+    """The assignment of a column on a duplicate key of an upsert."""
+    qualified = f"{context.table}.{column.name}"
+    if column.is_auto_increment:
+        return f"{qualified} = LAST_INSERT_ID({qualified})"
+    if column.is_primary:
+        return f"{qualified} = {qualified}"
+
+    return f"{qualified} = {column.name}"
+
+def _seek(column, context):
+    """A term of the keyset condition of a page: the primary key columns
+    before `column` equal to the page cursor, and `column` after it.
+
+    The terms are joined with OR rather than comparing row constructors,
+    which older MariaDB versions don't read as a range of the key.
+    """
+    keys = [ key.name for key in context.model.primary_keys ]
+    position = keys.index(column.name)
+    conditions = [ f"{context.alias}.{name} = after_{name}" for name in keys[:position] ]
+    conditions.append(f"{context.alias}.{column.name} > after_{column.name}")
+    return "(" + " AND ".join(conditions) + ")"
+
+def _json_table_type(column):
+    """The type of a JSON_TABLE column, reading ENUM and SET values as text."""
+    if column["DATA_TYPE"].upper() == "SET":
+        return f"VARCHAR({column['CHARACTER_MAXIMUM_LENGTH']})"
+
+    return column.get_type_string(enum_as_varchar=True)
+
+# Column sets, name -> function(context) returning a list of sgmodel.Column:
+column_sets = {
+    "columns":           lambda context: context.model.columns,
+    "list_columns":      lambda context: context.model.list_columns,
+    "unlisted":          lambda context: context.model.unlisted,
+    "primary":           lambda context: context.model.primary_keys,
+    "primary_head":      lambda context: context.model.primary_keys[:1],
+    "primary_tail":      lambda context: context.model.primary_keys[1:],
+    "non_primary":       lambda context: context.model.non_primary,
+    "confirm":           lambda context: context.confirm,
+    "confirmed_columns": _confirmed_columns,
+    "index":             lambda context: context.index,
+    "index_head":        lambda context: context.index[:1],
+    "index_tail":        lambda context: context.index[1:],
+    "partition":         lambda context: context.model.partition_columns,
+    "index_partition":   lambda context: [ column for column in context.model.partition_columns
+                                           if column not in context.index ],
+    "foreign":           lambda context: context.child.columns if context.child else [],
+    "foreign_head":      lambda context: context.child.columns[:1] if context.child else [],
+    "foreign_tail":      lambda context: context.child.columns[1:] if context.child else [],
+    "parent_primary":    lambda context: context.parent.model.primary_keys
+                                         if context.parent else [],
+    "parent_primary_head": lambda context: context.parent.model.primary_keys[:1]
+                                           if context.parent else [],
+    "parent_primary_tail": lambda context: context.parent.model.primary_keys[1:]
+                                           if context.parent else [],
+    "upsert_columns":    _upsert_columns,
+}
+
+# Values of a column, name -> function(column, context):
+item_functions = {
+    "name":      lambda column, context: column.name,
+    "confirmed": lambda column, context: column.name.split("confirm_", 1)[-1],
+    "type":      lambda column, context: column.get_type_string(),
+    "param":     lambda column, context:
+                     f"{column.name} {column.get_type_string(keep_not_null=not column.is_primary)}",
+    "qualified": lambda column, context: f"{context.alias}.{column.name}",
+    "after":     lambda column, context: f"after_{column.name}",
+    "after_param": lambda column, context: f"after_{column.name} {column.get_type_string()}",
+    "seek":      _seek,
+    "set":       lambda column, context: f"{context.alias}.{column.name} = {column.name}",
+    "json_path": lambda column, context:
+                     f"{column.name} {_json_table_type(column)} PATH '$.{column.name}'",
+    "referenced": lambda column, context: context.get_referenced(column).name,
+    "upsert_set": _upsert_set,
+}
+
+# Table sets, name -> function(context) returning a list of RenderContext
+# of other tables:
+table_sets = {
+    "children": lambda context: context.get_children(),
+}
+
+# Names of the formatting constants of a scripter:
+constant_names = [ "tab", "delim" ]
+
+
+class RenderContext:
+    """The values of a single rendering of a template."""
+    __slots__ = ( "model", "table", "proc", "list_proc", "confirm", "alias", "index",
+                  "parent", "child" )
+
+    def __init__(self, model, proc, list_proc=None, confirm=None, index=None):
+        """Constructor.
+
+        Args:
+           model (object):        sgmodel.TableModel of the table
+           proc (string):         name of the procedure
+           list_proc (string):    name of the table's List procedure, or None
+           confirm (list):        `confirm_` sgmodel.Column objects
+           index (list):          sgmodel.Column objects of the index of
+                                  a per-index kind, in index order
+        """
+        self.model = model
+        self.table = model.name
+        self.proc = proc
+        self.list_proc = list_proc
+        self.confirm = confirm or []
+        self.index = index or []
+        self.alias = model.name[0:1].lower()
+        self.parent = None
+        self.child = None
+
+    def get_value(self, name):
+        """Return the value, column set, or table set named `name`."""
+        function = value_functions.get(name)
+        if function is None:
+            function = column_sets.get(name) or table_sets[name]
+
+        return function(self)
+
+    def get_children(self):
+        """Return a context for each table that refers to the table, see
+        sgmodel.ChildTable."""
+        children = []
+        for child in self.model.children:
+            context = RenderContext(child.model, self.proc, self.list_proc)
+            context.parent = self
+            context.child = child
+            if child.joined and context.alias == self.alias:
+                context.alias = child.model.name[0:2].lower()
+            children.append(context)
+
+        return children
+
+    def get_referenced(self, column):
+        """Return the parent column referenced by a foreign key column."""
+        return self.child.referenced[self.child.columns.index(column)]
+
+    def get_columns(self, set_names):
+        """Return the concatenated columns of several column sets."""
+        if len(set_names) == 1:
+            return column_sets[set_names[0]](self)
+
+        columns = []
+        for name in set_names:
+            columns.extend(column_sets[name](self))
+
+        return columns
+
+
+def _text_op(text):
+    """Make a TEXT operation, which carries the line position after the text."""
+    newline = text.rfind("\n")
+    if newline < 0:
+        return (TEXT, text, False, len(text))
+
+    return (TEXT, text, True, len(text) - newline - 1)
+
+def parse_template(source, kind="template"):
+    """Parse template text into a tree of operations.
+
+    Args:
+       source (string): template text
+       kind (string):   name of the template, for error messages
+
+    Returns:
+       (list): operations, with sections holding lists of operations
+    """
+    root = []
+    stack = [ (None, None, root) ]
+    position = 0
+    text = []
+
+    def flush():
+        """Add the text collected since the last tag to the current section."""
+        if text:
+            stack[-1][2].append(_text_op("".join(text)))
+            text.clear()
+
+    for match in re_tag.finditer(source):
+        start, end = match.span()
+        text.append(source[position:start])
+        position = end
+
+        tag = match.group(0)
+        if tag in ("{{", "}}"):
+            text.append(tag[0])
+            continue
+
+        sigil, content = match.groups()
+        content = content.strip() if sigil != ">" else content
+
+        # A section tag alone on its line takes the line's newline:
+        if sigil and sigil in "?!#/" and (start == 0 or source[start - 1] == "\n") \
+           and source[end:end + 1] == "\n":
+            position = end + 1
+
+        flush()
+        ops = stack[-1][2]
+
+        if sigil == "":
+            in_each = any(code == EACH for code, _, _ in stack[1:])
+            check_name(content, kind, sections=False, in_each=in_each)
+            ops.append((VALUE, content))
+        elif sigil == "*":
+            item, _, sets = content.partition(":")
+            set_names = tuple(name.strip() for name in sets.split("+"))
+            if item not in item_functions:
+                raise TemplateError(f"{kind}: unknown column value '{item}' in {tag}")
+            for name in set_names:
+                if name not in column_sets:
+                    raise TemplateError(f"{kind}: unknown column set '{name}' in {tag}")
+            ops.append((LIST, item, set_names))
+        elif sigil == "|":
+            ops.append((ANCHOR,))
+        elif sigil == ">":
+            ops.append((RJUST, content))
+        elif sigil in "?!#":
+            if sigil == "#" and content not in column_sets and content not in table_sets:
+                raise TemplateError(f"{kind}: unknown column set '{content}' in {tag}")
+            check_name(content, kind, sections=True)
+            children = []
+            code = { "?": IF, "!": UNLESS, "#": EACH }[sigil]
+            if content in table_sets and sigil == "#":
+                if any(section in (EACH, TABLE) for section, _, _ in stack[1:]):
+                    raise TemplateError(f"{kind}: {tag} can't be in a repeated section")
+                code = TABLE
+            ops.append((code, content, children))
+            stack.append((code, content, children))
+        else:
+            if len(stack) == 1 or stack[-1][1] != content:
+                raise TemplateError(f"{kind}: unexpected {tag}")
+            stack.pop()
+
+    text.append(source[position:])
+    flush()
+
+    if len(stack) > 1:
+        raise TemplateError(f"{kind}: section '{stack[-1][1]}' is not closed")
+
+    return root
+
+def check_name(name, kind, sections, in_each=False):
+    """Raise a TemplateError if `name` isn't a value a template can use."""
+    if name in value_functions or name in constant_names:
+        return
+    if in_each and name in item_functions:
+        return
+    if sections and (name in column_sets or name in table_sets):
+        return
+
+    raise TemplateError(f"{kind}: unknown name '{name}'")
+
+def template_uses(ops, name):
+    """Return True if parsed operations use the value or column set `name`."""
+    for op in ops:
+        if op[0] == VALUE and op[1] == name:
+            return True
+        if op[0] == LIST and name in op[2]:
+            return True
+        if op[0] in (IF, UNLESS, EACH, TABLE) and (op[1] == name or template_uses(op[2], name)):
+            return True
+
+    return False
+
+def bind_template(ops, constants):
+    """Return a copy of parsed operations with the formatting constants
+    replaced by text, and neighboring text merged."""
+    bound = []
+    for op in ops:
+        if op[0] == VALUE and op[1] in constants:
+            op = _text_op(constants[op[1]])
+        elif op[0] in (IF, UNLESS, EACH, TABLE):
+            op = (op[0], op[1], bind_template(op[2], constants))
+
+        if op[0] == TEXT and bound and bound[-1][0] == TEXT:
+            op = _text_op(bound[-1][1] + op[1])
+            bound[-1] = op
+        else:
+            bound.append(op)
+
+    return bound
+
+
+def _text(value):
+    """Convert a template value to text."""
+    return "" if value is None else str(value)
+
+def generate_render_source(ops, name="render", nested=None):
+    """Generate the source of a render(context) function for bound operations.
+
+    The function appends the template's text fragments and values to a
+    list while keeping track of the current column, which positions lists
+    and right-justified text.
+
+    The operations of a {#children} section are rendered by a function of
+    their own, called with the context of each table.  Its operations are
+    appended to `nested`, the function being named N_ and the position in
+    `nested`.
+    """
+    if nested is None:
+        nested = []
+
+    lines = [ f"def {name}(context):",
+              "    get_value = context.get_value" ]
+
+    # Each value and column set used outside {#...} sections is looked up once:
+    values = {}
+    texts = {}
+
+    def collect(ops, in_each):
+        """Note the values and column sets that `ops` look up."""
+        for op in ops:
+            if op[0] == VALUE and not (in_each and op[1] in item_functions):
+                values[op[1]] = True
+                texts[op[1]] = True
+            elif op[0] == TABLE:
+                values[op[1]] = True
+            elif op[0] in (IF, UNLESS, EACH):
+                values[op[1]] = True
+                collect(op[2], in_each or op[0] == EACH)
+
+    collect(ops, False)
+    for name in values:
+        lines.append(f"    v_{name} = get_value({name!r})")
+    for name in texts:
+        lines.append(f"    t_{name} = _text(v_{name})")
+
+    lines.extend([ "    out = []",
+                   "    append = out.append",
+                   "    col = 0",
+                   "    anchor = 0" ])
+
+    def emit(ops, indent, item_var, depth):
+        """Add the lines of code of `ops`, indented by `indent` levels."""
+        pad = "    " * indent
+        start = len(lines)
+        for op in ops:
+            code = op[0]
+            if code == TEXT:
+                lines.append(f"{pad}append({op[1]!r})")
+                lines.append(f"{pad}col = {op[3]}" if op[2] else f"{pad}col += {op[3]}")
+            elif code == VALUE:
+                if item_var is not None and op[1] in item_functions:
+                    lines.append(f"{pad}text = _text(I_{op[1]}({item_var}, context))")
+                    lines.append(f"{pad}append(text)")
+                    lines.append(f"{pad}col += len(text)")
+                else:
+                    lines.append(f"{pad}append(t_{op[1]})")
+                    lines.append(f"{pad}col += len(t_{op[1]})")
+            elif code == LIST:
+                lines.append(f"{pad}text = format_list(col, [ I_{op[1]}(column, context) "
+                             f"for column in context.get_columns({op[2]!r}) ])")
+                lines.append(f"{pad}append(text)")
+                lines.append(f"{pad}newline = text.rfind('\\n')")
+                lines.append(f"{pad}col = col + len(text) if newline < 0 "
+                             "else len(text) - newline - 1")
+            elif code == ANCHOR:
+                lines.append(f"{pad}anchor = col")
+            elif code == RJUST:
+                lines.append(f"{pad}text = ' ' * (anchor - {len(op[1])}) + {op[1]!r}")
+                lines.append(f"{pad}append(text)")
+                lines.append(f"{pad}col += len(text)")
+            elif code == TABLE:
+                lines.append(f"{pad}for table_context in v_{op[1]}:")
+                lines.append(f"{pad}    text = N_{len(nested)}(table_context)")
+                lines.append(f"{pad}    append(text)")
+                lines.append(f"{pad}    newline = text.rfind('\\n')")
+                lines.append(f"{pad}    col = col + len(text) if newline < 0 "
+                             "else len(text) - newline - 1")
+                nested.append(op[2])
+            elif code == EACH:
+                variable = f"item{depth}"
+                lines.append(f"{pad}for {variable} in v_{op[1]}:")
+                emit(op[2], indent + 1, variable, depth + 1)
+            else:
+                negation = "" if code == IF else "not "
+                lines.append(f"{pad}if {negation}v_{op[1]}:")
+                emit(op[2], indent + 1, item_var, depth)
+
+        if len(lines) == start:
+            lines.append(f"{pad}pass")
+
+    emit(ops, 1, None, 0)
+    lines.append("    return ''.join(out)")
+    return "\n".join(lines) + "\n"
+
+
+class BoundTemplate:
+    """A compiled template bound to the formatting settings of a scripter.
+
+    The bound template is compiled to a Python function, so rendering
+    doesn't interpret the template's operations.
+    """
+    ops = None
+    printer_limit = 80
+    printer_items_per_line = -1
+    printers = None
+    render = None
+
+    def __init__(self, ops, constants, printer_limit, printer_items_per_line):
+        """Constructor.
+
+        Args:
+           ops (list):              operations from parse_template()
+           constants (dictionary):  {tab} and {delim} values
+           printer_limit (integer): right-side character soft-limit of lists
+           printer_items_per_line (integer): items per line of lists, -1 for
+                                    as many as fit
+        """
+        self.ops = bind_template(ops, constants)
+        self.printer_limit = printer_limit
+        self.printer_items_per_line = printer_items_per_line
+        self.printers = {}
+
+        namespace = { f"I_{name}": function for name, function in item_functions.items() }
+        namespace["_text"] = _text
+        namespace["format_list"] = self.format_list
+
+        nested = []
+        sources = [ generate_render_source(self.ops, "render", nested) ]
+        position = 0
+        while position < len(nested):
+            sources.append(generate_render_source(nested[position], f"N_{position}", nested))
+            position += 1
+
+        #pylint: disable=exec-used
+        exec(compile("\n".join(sources), "<template>", "exec"), namespace)
+        self.render = namespace["render"]
+
+    def format_list(self, indent, items):
+        """Return `items` formatted by a CurbedPrinter for a list starting
+        at column `indent`."""
+        printer = self.printers.get(indent)
+        if printer is None:
+            printer = CurbedPrinter(indent, self.printer_limit,
+                                    items_per_line = self.printer_items_per_line)
+            self.printers[indent] = printer
+
+        return printer.format(items)
+
+
+class ProcedureKind:
+    """A registered procedure kind."""
+    name = None
+    source = None
+    suffix = None
+    in_all = True
+    per_index = False
+    filters = None
+    ops = None
+
+    def __init__(self, name, source, suffix=None, in_all=True, per_index=False,
+                 filters=None):
+        """Constructor, see register_procedure_kind()."""
+        self.name = name
+        self.source = source
+        self.suffix = suffix if suffix is not None else name.capitalize()
+        self.in_all = in_all
+        self.per_index = per_index
+        self.filters = filters
+        self.ops = parse_template(source, name)
+
+    def uses(self, name):
+        """Return True if the kind's template uses the value or column set `name`."""
+        return template_uses(self.ops, name)
+
+    def get_unpruned_columns(self, model, index=None):
+        """Return the partition columns of a table that the kind's statements
+        don't match, so that the server can't prune the table's partitions.
+
+        Args:
+           model (object):  sgmodel.TableModel of the table
+           index (list):    sgmodel.Column objects of the index of a
+                            per-index kind
+
+        Returns:
+           (list): sgmodel.Column objects, empty for a table that isn't
+                   partitioned or a kind without `filters`
+        """
+        if self.filters is None or not model.partition_columns:
+            return []
+
+        context = RenderContext(model, None, index=index)
+        matched = { column.name for column in context.get_columns(self.filters) }
+        return [ column for column in model.partition_columns if column.name not in matched ]
+
+
+# Registered kinds, in registration order, which is the order of
+# their procedures in `--script all` output:
+procedure_kinds = {}
+
+def register_procedure_kind(name, source, suffix=None, in_all=True, per_index=False,
+                            filters=None):
+    """Register a procedure kind, replacing a kind of the same name.
+
+    Args:
+       name (string):   name of the kind, used as a --script value
+       source (string): template text, see the module description
+       suffix (string, optional): procedure name suffix following the
+                        prefix, by default the capitalized `name`
+       in_all (boolean, optional): False to leave the kind out of
+                        `--script all`
+       per_index (boolean, optional): True to generate a procedure for each
+                        secondary index of a table, named with the index name
+                        following the suffix, with the index columns as the
+                        `index` column set
+       filters (tuple, optional): names of the column sets whose columns the
+                        kind's statements match with equality, for the
+                        warning of a procedure that can't prune the partitions
+                        of a partitioned table.  None, the default, for a kind
+                        that isn't checked, like one that only inserts rows.
+
+    Returns:
+       (object): the ProcedureKind
+
+    Raises:
+       TemplateError: if the template can't be compiled
+    """
+    kind = ProcedureKind(name, source, suffix, in_all, per_index, filters)
+    procedure_kinds[name] = kind
+    return kind
+
+def get_kind(name):
+    """Return the registered kind named `name`, or None."""
+    return procedure_kinds.get(name)
+
+def get_kind_names(all_only=False):
+    """Return the names of the registered kinds, optionally only those in `--script all`."""
+    return [ name for name, kind in procedure_kinds.items() if kind.in_all or not all_only ]
+
+def kinds_use(kind_names, name):
+    """Return True if a registered kind of `kind_names` uses the value `name`."""
+    return any(procedure_kinds[kind].uses(name)
+               for kind in kind_names if kind in procedure_kinds)
+
+def kinds_filter(kind_names):
+    """Return True if a registered kind of `kind_names` declares the
+    columns its statements match, see register_procedure_kind()."""
+    return any(procedure_kinds[kind].filters is not None
+               for kind in kind_names if kind in procedure_kinds)
+
+def register_template_texts(templates):
+    """Register kinds from a dictionary of kind name -> template text,
+    as read by read_template_files()."""
+    for name, source in (templates or {}).items():
+        kind = procedure_kinds.get(name)
+        if kind is None or kind.source != source:
+            register_procedure_kind(name, source)
+
+def read_template_files(paths):
+    """Read template files, naming each kind after its file name.
+
+    Args:
+       paths (list): template file paths, the name of a kind being the
+                     file's base name without its extension
+
+    Returns:
+       (dictionary): kind name -> template text
+    """
+    templates = {}
+    for path in paths or []:
+        name = path.rsplit("/", 1)[-1].split(".", 1)[0]
+        with open(path, mode="rt", encoding="utf-8") as template_file:
+            templates[name] = template_file.read()
+
+    return templates
+
+
+PROC_TOP = """DROP PROCEDURE IF EXISTS {proc} {delim}
+CREATE PROCEDURE {proc} ("""
+
+# Conditions matching every column of the primary key:
+PK_WHERE = """{>WHERE }{#primary_head}{alias}.{name} = {name}{/primary_head}{#primary_tail}
+{>AND }{alias}.{name} = {name}{/primary_tail}"""
+
+# Tests that every column of the primary key is NULL, or with `after_`,
+# every column of a page cursor:
+PK_NULL = """{#primary_head}{name} IS NULL{/primary_head}""" \
+    """{#primary_tail} AND {name} IS NULL{/primary_tail}"""
+AFTER_NULL = """{#primary_head}{after} IS NULL{/primary_head}""" \
+    """{#primary_tail} AND {after} IS NULL{/primary_tail}"""
+AFTER_ANY_NULL = """{#primary_head}{after} IS NULL{/primary_head}""" \
+    """{#primary_tail} OR {after} IS NULL{/primary_tail}"""
+
+LIST_TEMPLATE = """{!pk}
+-- Can't generate list procedure without autonumber primary key field.
+
+{/pk}
+{?pk}
+""" + PROC_TOP + """{*param:primary})
+BEGIN
+{tab}IF """ + PK_NULL + """ THEN
+{tab}{tab}SELECT {|}{*qualified:list_columns}
+{>FROM }{table} {alias};
+{tab}ELSE
+{tab}{tab}SELECT {|}{*qualified:list_columns}
+{>FROM }{table} {alias}
+""" + PK_WHERE + """;
+{tab}END IF;
+END {delim}
+{/pk}
+"""
+
+ADD_TEMPLATE = """{!auto_pk}
+-- Can't generate add procedure without self-generating(autonumber) primary key field.
+{/auto_pk}
+{?auto_pk}
+""" + PROC_TOP + """{*param:non_primary})
+BEGIN
+{tab}INSERT INTO {table} ({|}{*name:non_primary})
+{>VALUES (}{*name:non_primary});
+{?list_proc}
+
+{tab}IF ROW_COUNT() > 0 THEN
+{tab}{tab}CALL {list_proc}(LAST_INSERT_ID());
+{tab}END IF;
+{/list_proc}
+END {delim}
+{/auto_pk}
+"""
+
+READ_TEMPLATE = """{!pk}
+-- Can't generate read procedure without autonumber primary key field.
+
+{/pk}
+{?pk}
+""" + PROC_TOP + """{*param:primary+confirm})
+BEGIN
+{tab}SELECT ({|}{*qualified:confirmed_columns})
+{>FROM }{table} {alias}
+""" + PK_WHERE + """{#confirm}
+{>AND }{alias}.{confirmed} = {name}{/confirm};
+END {delim}
+{/pk}
+"""
+
+UPDATE_TEMPLATE = """{!pk}
+-- Can't generate update procedure without autonumber primary key field.
+
+{/pk}
+{?pk}
+""" + PROC_TOP + """{*param:confirmed_columns})
+BEGIN
+{tab}UPDATE {|}{table} {alias}
+{>SET }{*set:non_primary}
+""" + PK_WHERE + """{#confirm}
+{>AND }{alias}.{confirmed} = {name}{/confirm};
+{?list_proc}
+
+{tab}IF ROW_COUNT() > 0 THEN
+{tab}{tab}CALL {list_proc}({*name:primary});
+{tab}END IF;
+{/list_proc}
+END {delim}
+{/pk}
+"""
+
+DELETE_TEMPLATE = """{!pk}
+-- Can't generate update procedure without autonumber primary key field.
+
+{/pk}
+{?pk}
+""" + PROC_TOP + """{*param:primary+confirm})
+BEGIN
+{tab}DELETE FROM {|}{alias} USING {table} AS {alias}
+""" + PK_WHERE + """{#confirm}
+{>AND }{alias}.{confirmed} = {name}{/confirm};
+
+{tab}SELECT ROW_COUNT() AS deleted;
+END {delim}
+{/pk}
+"""
+
+PAGE_TEMPLATE = """{!pk}
+-- Can't generate page procedure without primary key field.
+
+{/pk}
+{?pk}
+""" + PROC_TOP + """{*after_param:primary}, page_size INT UNSIGNED)
+BEGIN
+{tab}IF page_size IS NULL THEN
+{tab}{tab}SET page_size = {page_size};
+{tab}END IF;
+
+{tab}IF """ + AFTER_NULL + """ THEN
+{tab}{tab}SELECT {|}{*qualified:list_columns}
+{>FROM }{table} {alias}
+{>ORDER BY }{*qualified:primary}
+{>LIMIT }page_size;
+{?composite_pk}
+{tab}ELSEIF """ + AFTER_ANY_NULL + """ THEN
+{tab}{tab}SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Incomplete page cursor';
+{/composite_pk}
+{tab}ELSE
+{tab}{tab}SELECT {|}{*qualified:list_columns}
+{>FROM }{table} {alias}
+{?composite_pk}
+{>WHERE }{#primary_head}{seek}{/primary_head}{#primary_tail}
+{>OR }{seek}{/primary_tail}
+{/composite_pk}
+{!composite_pk}
+{>WHERE }{alias}.{pk} > after_{pk}
+{/composite_pk}
+{>ORDER BY }{*qualified:primary}
+{>LIMIT }page_size;
+{tab}END IF;
+END {delim}
+{/pk}
+"""
+
+INDEX_TEMPLATE = """DROP PROCEDURE IF EXISTS {proc} {delim}
+CREATE PROCEDURE {proc} ({*param:index+index_partition})
+BEGIN
+{tab}SELECT {|}{*qualified:list_columns}
+{>FROM }{table} {alias}
+{>WHERE }{#index_head}{alias}.{name} = {name}{/index_head}{#index_tail}
+{>AND }{alias}.{name} = {name}{/index_tail}{#index_partition}
+{>AND }{alias}.{name} = {name}{/index_partition};
+END {delim}
+"""
+
+ADD_BULK_TEMPLATE = """{!auto_pk}
+-- Can't generate add_bulk procedure without self-generating(autonumber) primary key field.
+{/auto_pk}
+{?auto_pk}
+""" + PROC_TOP + """rows_json LONGTEXT)
+BEGIN
+{tab}DECLARE inserted INT UNSIGNED;
+
+{tab}INSERT INTO {table}
+{tab}{tab}({*name:non_primary})
+{tab}SELECT {|}{*qualified:non_primary}
+{>FROM }JSON_TABLE(rows_json, '$[*]' COLUMNS (
+{tab}{tab}{tab}{*json_path:non_primary}
+{tab}{tab})) AS {alias};
+
+{tab}SET inserted = ROW_COUNT();
+
+{tab}-- The keys are consecutive unless innodb_autoinc_lock_mode is 2:
+{tab}SELECT {|}inserted,
+{>}IF(inserted > 0, LAST_INSERT_ID(), NULL) AS first_{pk},
+{>}IF(inserted > 0, LAST_INSERT_ID() + inserted - 1, NULL) AS last_{pk};
+END {delim}
+{/auto_pk}
+"""
+
+DETAIL_TEMPLATE = """{!pk}
+-- Can't generate detail procedure without primary key field.
+
+{/pk}
+{?pk}
+{!unlisted}
+-- No columns are left out of the list results for a detail procedure.
+
+{/unlisted}
+{?unlisted}
+""" + PROC_TOP + """{*param:primary})
+BEGIN
+{tab}SELECT {|}{*qualified:primary+unlisted}
+{>FROM }{table} {alias}
+""" + PK_WHERE + """;
+END {delim}
+{/unlisted}
+{/pk}
+"""
+
+UPSERT_TEMPLATE = """{!upsert_key}
+-- Can't generate upsert procedure without a primary or unique key.
+
+{/upsert_key}
+{?upsert_key}
+""" + PROC_TOP + """{*param:primary+non_primary})
+BEGIN
+{?list_proc}
+{?auto_key}
+{tab}DECLARE changed INT;
+
+{/auto_key}
+{/list_proc}
+{tab}INSERT INTO {table} ({|}{*name:primary+non_primary})
+{>VALUES (}{*name:primary+non_primary})
+{tab}ON DUPLICATE KEY UPDATE {*upsert_set:upsert_columns};
+{?list_proc}
+{?pk}
+
+{?auto_key}
+{tab}SET changed = ROW_COUNT();
+{tab}IF changed > 0 THEN
+{tab}{tab}-- LAST_INSERT_ID() is also the key of an updated row:
+{tab}{tab}IF {auto_key} IS NULL OR changed <> 1 THEN
+{tab}{tab}{tab}SET {auto_key} = LAST_INSERT_ID();
+{tab}{tab}END IF;
+{tab}{tab}CALL {list_proc}({*name:primary});
+{tab}END IF;
+{/auto_key}
+{!auto_key}
+{tab}IF ROW_COUNT() > 0 THEN
+{tab}{tab}CALL {list_proc}({*name:primary});
+{tab}END IF;
+{/auto_key}
+{/pk}
+{/list_proc}
+END {delim}
+{/upsert_key}
+"""
+
+# Conditions joining a referring table to the parent row, and matching
+# every column of the parent's primary key:
+FK_JOIN_ON = """{>ON }{#foreign_head}{alias}.{name} = {parent_alias}.{referenced}""" \
+    """{/foreign_head}{#foreign_tail}
+{>AND }{alias}.{name} = {parent_alias}.{referenced}{/foreign_tail}"""
+
+PARENT_PK_WHERE = """{>WHERE }{#parent_primary_head}{parent_alias}.{name} = {name}""" \
+    """{/parent_primary_head}{#parent_primary_tail}
+{>AND }{parent_alias}.{name} = {name}{/parent_primary_tail}"""
+
+FETCH_TEMPLATE = """{!pk}
+-- Can't generate fetch procedure without primary key field.
+
+{/pk}
+{?pk}
+{!children}
+-- No tables refer to this table with a foreign key for a fetch procedure.
+
+{/children}
+{?children}
+""" + PROC_TOP + """{*param:primary})
+BEGIN
+{tab}SELECT {|}{*qualified:columns}
+{>FROM }{table} {alias}
+""" + PK_WHERE + """;
+{#children}
+
+{tab}SELECT {|}{*qualified:list_columns}
+{?joined}
+{>FROM }{parent} {parent_alias}
+{>JOIN }{table} {alias}
+""" + FK_JOIN_ON + """
+""" + PARENT_PK_WHERE + """;
+{/joined}
+{!joined}
+{>FROM }{table} {alias}
+{>WHERE }{#foreign_head}{alias}.{name} = {referenced}{/foreign_head}{#foreign_tail}
+{>AND }{alias}.{name} = {referenced}{/foreign_tail};
+{/joined}
+{/children}
+END {delim}
+{/children}
+{/pk}
+"""
+
+register_procedure_kind("list", LIST_TEMPLATE, filters=("primary",))
+register_procedure_kind("add", ADD_TEMPLATE)
+register_procedure_kind("read", READ_TEMPLATE, filters=("primary",))
+register_procedure_kind("update", UPDATE_TEMPLATE, filters=("primary",))
+register_procedure_kind("delete", DELETE_TEMPLATE, filters=("primary",))
+register_procedure_kind("page", PAGE_TEMPLATE, in_all=False, filters=())
+register_procedure_kind("add_bulk", ADD_BULK_TEMPLATE, suffix="Add_Bulk", in_all=False)
+register_procedure_kind("detail", DETAIL_TEMPLATE, in_all=False, filters=("primary",))
+register_procedure_kind("fetch", FETCH_TEMPLATE, in_all=False, filters=("primary",))
+register_procedure_kind("upsert", UPSERT_TEMPLATE, in_all=False)
+register_procedure_kind("index", INDEX_TEMPLATE, suffix="By_", in_all=False, per_index=True,
+                        filters=("index", "index_partition"))
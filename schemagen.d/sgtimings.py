@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+"""Wall time, query and row accounting for the --timings option.
+
+A Timings object accumulates the time spent in named phases of a run
+(resolve, connect, introspect, generate, output, deploy, explain), the generation
+time of each table, and the number of queries executed and rows fetched
+through a connection wrapped by wrap_connection().
+
+Phases may nest, in which case the time of the inner phase is not also
+counted in the outer phase, so the phase times add up to the run time.
+"""
+
+import contextlib
+import json
+import time
+
+# Phases in the order they are reported, other phases follow:
+phase_order = [ "resolve", "connect", "introspect", "generate", "output", "deploy",
+                "explain" ]
+
+# Number of tables listed in the text report:
+slowest_tables_count = 10
+
+
+class Timings:
+    """Accumulated times and counts of a run."""
+    started = None
+    phases = None
+    tables = None
+    queries = 0
+    rows = 0
+    stack = None
+
+    def __init__(self):
+        """Constructor, starting the run's clock."""
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.tables = {}
+        self.stack = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Context manager that adds the time of its block to phase `name`."""
+        start = time.perf_counter()
+        self.stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self.stack.pop()
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed - nested
+            if self.stack:
+                self.stack[-1] += elapsed
+
+    def iterate(self, iterable, name):
+        """Yield the items of `iterable`, adding the time taken to
+        produce each item to phase `name`."""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def add_table(self, table, seconds):
+        """Record the generation time of a table."""
+        self.tables[table] = self.tables.get(table, 0.0) + seconds
+
+    def wrap_connection(self, conn):
+        """Return `conn` wrapped to count its queries and rows in this object."""
+        return CountingConnection(conn, self)
+
+    def get_report(self):
+        """Return the timings as a dictionary, times in milliseconds."""
+        names = [ name for name in phase_order if name in self.phases ]
+        names.extend(name for name in self.phases if name not in phase_order)
+
+        return { "phases": { name: self.phases[name] * 1000 for name in names },
+                 "total": (time.perf_counter() - self.started) * 1000,
+                 "queries": self.queries,
+                 "rows": self.rows,
+                 "tables": { table: seconds * 1000
+                             for table, seconds in sorted(self.tables.items()) } }
+
+    def print_report(self, report_format, file):
+        """Print the report as "text" or "json" to `file`."""
+        report = self.get_report()
+
+        if report_format == "json":
+            print(json.dumps(report, indent=1), file=file)
+            return
+
+        print("schemagen timings (ms):", file=file)
+        for name, msecs in report["phases"].items():
+            print(f"  {name:<12}{msecs:>10.1f}", file=file)
+        print(f"  {'total':<12}{report['total']:>10.1f}", file=file)
+        print(f"queries {report['queries']}, rows fetched {report['rows']}", file=file)
+
+        tables = sorted(report["tables"].items(), key=lambda item: item[1], reverse=True)
+        if tables:
+            print(f"slowest of {len(tables)} tables (ms):", file=file)
+            for table, msecs in tables[:slowest_tables_count]:
+                print(f"  {table:<30}{msecs:>10.2f}", file=file)
+
+
+class CountingCursor:
+    """Cursor wrapper that counts executed queries and fetched rows."""
+    cursor = None
+    timings = None
+
+    def __init__(self, cursor, timings):
+        """Constructor.
+
+        Args:
+           cursor (object):  the cursor to wrap
+           timings (object): Timings that counts the queries and rows
+        """
+        self.cursor = cursor
+        self.timings = timings
+
+    def __getattr__(self, name):
+        """Pass other attributes through to the wrapped cursor."""
+        return getattr(self.cursor, name)
+
+    def __enter__(self):
+        """Enter the wrapped cursor's context, returning this wrapper."""
+        self.cursor.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        """Exit the wrapped cursor's context."""
+        return self.cursor.__exit__(*args)
+
+    def __iter__(self):
+        """Iterate over the rows through fetchone(), counting them."""
+        return iter(self.fetchone, None)
+
+    def execute(self, query, *args, **kwargs):
+        """Execute a query, see the wrapped cursor."""
+        self.timings.queries += 1
+        return self.cursor.execute(query, *args, **kwargs)
+
+    def fetchone(self):
+        """Fetch a row, see the wrapped cursor."""
+        row = self.cursor.fetchone()
+        if row is not None:
+            self.timings.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        """Fetch rows, see the wrapped cursor."""
+        rows = self.cursor.fetchmany(size) if size is not None else self.cursor.fetchmany()
+        self.timings.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        """Fetch the remaining rows, see the wrapped cursor."""
+        rows = self.cursor.fetchall()
+        self.timings.rows += len(rows)
+        return rows
+
+
+class CountingConnection:
+    """Connection wrapper whose cursors count queries and rows."""
+    conn = None
+    timings = None
+
+    def __init__(self, conn, timings):
+        """Constructor.
+
+        Args:
+           conn (object):    the connection to wrap
+           timings (object): Timings that counts the queries and rows
+        """
+        self.conn = conn
+        self.timings = timings
+
+    def __getattr__(self, name):
+        """Pass other attributes through to the wrapped connection."""
+        return getattr(self.conn, name)
+
+    def cursor(self, *args, **kwargs):
+        """Return a counting cursor, see the wrapped connection."""
+        return CountingCursor(self.conn.cursor(*args, **kwargs), self.timings)
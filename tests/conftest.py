@@ -0,0 +1,129 @@
+"""Shared fixtures: a small schema with a composite key, a partitioned
+table and a foreign key, as saved in a snapshot file, the script
+options of the default command line, and a function that generates
+procedures like the main program."""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "schemagen.d"))
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error,wrong-import-position
+import sgdb
+import sgsnapshot
+import sgtables
+#pylint: enable=import-error,wrong-import-position
+
+DATABASE = "shop"
+
+# (COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION,
+#  NUMERIC_SCALE, IS_NULLABLE, COLUMN_KEY, COLUMN_TYPE, EXTRA) rows:
+TABLE_COLUMNS = {
+    "Link": [
+        [ "a_id", "int", None, 10, 0, "NO", "PRI", "int(11)", "" ],
+        [ "b_id", "int", None, 10, 0, "NO", "PRI", "int(11)", "" ],
+        [ "note", "varchar", 40, None, None, "YES", "", "varchar(40)", "" ],
+    ],
+    "Orders": [
+        [ "id", "int", None, 10, 0, "NO", "PRI", "int(11)", "auto_increment" ],
+        [ "created", "date", None, None, None, "NO", "PRI", "date", "" ],
+        [ "customer", "int", None, 10, 0, "NO", "MUL", "int(11)", "" ],
+        [ "total", "decimal", None, 10, 2, "YES", "", "decimal(10,2)", "" ],
+    ],
+    "Person": [
+        [ "id", "int", None, 10, 0, "NO", "PRI", "int(10) unsigned", "auto_increment" ],
+        [ "lname", "varchar", 40, None, None, "NO", "", "varchar(40)", "" ],
+        [ "fname", "varchar", 40, None, None, "YES", "", "varchar(40)", "" ],
+    ],
+    "Phone": [
+        [ "id", "int", None, 10, 0, "NO", "PRI", "int(10) unsigned", "auto_increment" ],
+        [ "person_id", "int", None, 10, 0, "NO", "MUL", "int(10) unsigned", "" ],
+        [ "number", "varchar", 20, None, None, "NO", "", "varchar(20)", "" ],
+    ],
+}
+
+TABLE_DETAILS = {
+    "table_rows": { "Link": 10, "Orders": 50000, "Person": 200, "Phone": 300 },
+    "indexes": {
+        "Link": { "PRIMARY": [ "b_id", "a_id" ], "note": [ "note" ] },
+        "Orders": { "PRIMARY": [ "id", "created" ], "customer": [ "customer" ] },
+        "Phone": { "PRIMARY": [ "id" ], "person_id": [ "person_id" ] },
+    },
+    "unique_keys": {},
+    "partitions": {
+        "Orders": { "method": "RANGE", "expression": "year(`created`)",
+                    "subpartition_method": None, "subpartition_expression": None },
+    },
+    "foreign_keys": {
+        "Person": [ { "name": "fk_phone_person", "table": "Phone",
+                      "columns": [ "person_id" ], "referenced": [ "id" ] } ],
+    },
+}
+
+
+def make_snapshot_data(table_columns=None):
+    """Return the contents of a snapshot file of the test schema.
+
+    Args:
+       table_columns (dictionary, optional): table name -> column rows,
+                                             `TABLE_COLUMNS` if omitted
+    """
+    if table_columns is None:
+        table_columns = TABLE_COLUMNS
+
+    schema = { "tables": list(table_columns), "procedures": [], "columns": table_columns }
+    schema.update(TABLE_DETAILS)
+
+    return { "format": sgsnapshot.SNAPSHOT_FORMAT, "version": sgsnapshot.SNAPSHOT_VERSION,
+             "created": "2026-01-01 00:00:00", "host": "localhost",
+             "databases": [ DATABASE ], "column_names": sgdb.column_field_names,
+             "schemas": { DATABASE: schema } }
+
+def render(snapshot, table, script, options):
+    """Generate the `script` procedures of `table` like the main program,
+    reading only the details that `script` needs.
+
+    Args:
+       snapshot (object):    sgsnapshot.Snapshot holding the table
+       table (string):       name of the table
+       script (string):      the procedure kind, or "all"
+       options (dictionary): script options, see sgtables.get_script_options()
+
+    Returns:
+       (tuple): script text and procedure sections, see
+                sgtables.render_table_script()
+    """
+    options = dict(options, script=script)
+
+    details = {}
+    for argument, function_name in sgtables.get_needed_details(options):
+        detail = getattr(sgsnapshot, function_name)(snapshot, DATABASE, [ table ]).get(table)
+        if detail is not None:
+            details[argument] = detail
+
+    table_fields = sgsnapshot.collect_table_columns(snapshot, DATABASE, table)
+    return sgtables.render_table_script(table, table_fields, "App_", options, details=details)
+
+def write_snapshot(path, table_columns=None):
+    """Write a snapshot file of the test schema, see make_snapshot_data()."""
+    with open(path, mode="wt", encoding="utf-8") as snapfile:
+        json.dump(make_snapshot_data(table_columns), snapfile)
+
+
+@pytest.fixture
+def snapshot():
+    """The test schema as a sgsnapshot.Snapshot."""
+    return sgsnapshot.Snapshot(make_snapshot_data())
+
+@pytest.fixture
+def script_options():
+    """Script options of the default command line, see sgtables.get_script_options()."""
+    return { "script": "all", "confirm_fields": None, "indent_chars": 4, "delimiter": "$$",
+             "max_chars": 80, "items_per_line": -1, "templates": None,
+             "list_include": None, "list_exclude": None }
@@ -0,0 +1,67 @@
+"""The add_bulk procedure, which inserts the rows of a JSON array."""
+
+import pytest
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+import sgscripts
+import sgsnapshot
+#pylint: enable=import-error
+
+from conftest import TABLE_COLUMNS, make_snapshot_data, render
+
+ITEM_COLUMNS = [
+    [ "id", "int", None, 10, 0, "NO", "PRI", "int(10) unsigned", "auto_increment" ],
+    [ "name", "varchar", 80, None, None, "NO", "", "varchar(80)", "" ],
+    [ "size", "enum", 6, None, None, "YES", "", "enum('small','medium','large')", "" ],
+    [ "tags", "set", 11, None, None, "YES", "", "set('new','sale')", "" ],
+    [ "price", "decimal", None, 8, 2, "NO", "", "decimal(8,2)", "" ],
+    [ "stock", "int", None, 10, 0, "YES", "", "int(10) unsigned", "" ],
+]
+
+
+@pytest.fixture
+def item_snapshot():
+    """The test schema with an Item table of many column types."""
+    return sgsnapshot.Snapshot(make_snapshot_data(dict(TABLE_COLUMNS, Item=ITEM_COLUMNS)))
+
+def test_json_table_types_are_the_parameter_types(item_snapshot, script_options):
+    text, sections = render(item_snapshot, "Item", "add_bulk", script_options)
+
+    assert [ name for name, _, _ in sections ] == [ "App_Add_Bulk" ]
+    assert "CREATE PROCEDURE App_Add_Bulk (rows_json LONGTEXT)" in text
+    assert "FROM JSON_TABLE(rows_json, '$[*]' COLUMNS (" in text
+
+    for column in sgsnapshot.collect_table_columns(item_snapshot, "shop", "Item")[1:]:
+        name = column["COLUMN_NAME"]
+        if column["DATA_TYPE"] == "set":
+            type_string = f"VARCHAR({column['CHARACTER_MAXIMUM_LENGTH']})"
+        else:
+            type_string = sgscripts.get_type_string_from_field(column, enum_as_varchar=True)
+        assert f"{name} {type_string} PATH '$.{name}'" in text
+
+def test_autonumber_key_is_left_out(item_snapshot, script_options):
+    text, _ = render(item_snapshot, "Item", "add_bulk", script_options)
+
+    assert "INSERT INTO Item\n        (name, size, tags, price, stock)\n" in text
+    assert "SELECT i.name, i.size, i.tags, i.price, i.stock\n" in text
+    assert "id INT" not in text
+    assert "$.id'" not in text
+
+def test_inserted_key_range_is_selected(snapshot, script_options):
+    text, _ = render(snapshot, "Person", "add_bulk", script_options)
+
+    assert "SET inserted = ROW_COUNT();" in text
+    assert "IF(inserted > 0, LAST_INSERT_ID(), NULL) AS first_id," in text
+    assert "IF(inserted > 0, LAST_INSERT_ID() + inserted - 1, NULL) AS last_id;" in text
+
+def test_add_bulk_needs_an_autonumber_key(snapshot, script_options):
+    for table in ("Link", "Orders"):
+        text, _ = render(snapshot, table, "add_bulk", script_options)
+        assert "CREATE PROCEDURE" not in text
+        assert "Can't generate add_bulk procedure" in text
+
+def test_add_bulk_is_not_in_all(snapshot, script_options):
+    _, sections = render(snapshot, "Person", "all", script_options)
+    assert "App_Add_Bulk" not in [ name for name, _, _ in sections ]
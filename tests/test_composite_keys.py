@@ -0,0 +1,27 @@
+"""Procedures of a table whose primary key has several columns."""
+
+from conftest import render
+
+
+def test_list_tests_every_key_column(snapshot, script_options):
+    text, _ = render(snapshot, "Link", "list", script_options)
+
+    assert "CREATE PROCEDURE App_List (b_id INT, a_id INT)" in text
+    assert "IF b_id IS NULL AND a_id IS NULL THEN" in text
+    assert "WHERE l.b_id = b_id\n           AND l.a_id = a_id;" in text
+
+def test_procedures_match_the_whole_key(snapshot, script_options):
+    text, sections = render(snapshot, "Link", "all", script_options)
+
+    assert [ name for name, _, _ in sections ] == [ "App_List", "App_Add", "App_Read",
+                                                    "App_Update", "App_Delete" ]
+    for name, start, end in sections:
+        if name != "App_Add":
+            assert "l.b_id = b_id" in text[start:end], name
+            assert "l.a_id = a_id" in text[start:end], name
+
+def test_add_needs_a_single_autonumber_key(snapshot, script_options):
+    for table in ("Link", "Orders"):
+        text, _ = render(snapshot, table, "add", script_options)
+        assert "CREATE PROCEDURE" not in text
+        assert "Can't generate add procedure" in text
@@ -0,0 +1,19 @@
+"""The fetch procedure, which returns a record and the records that
+refer to it with a foreign key."""
+
+from conftest import render
+
+
+def test_fetch_selects_the_referring_rows(snapshot, script_options):
+    text, _ = render(snapshot, "Person", "fetch", script_options)
+
+    assert "CREATE PROCEDURE App_Fetch (id INT UNSIGNED)" in text
+    assert "FROM Person p\n     WHERE p.id = id;" in text
+    assert "FROM Phone p\n     WHERE p.person_id = id;" in text
+
+def test_fetch_without_referring_tables(snapshot, script_options):
+    text, sections = render(snapshot, "Phone", "fetch", script_options)
+
+    assert "No tables refer to this table" in text
+    assert "CREATE PROCEDURE" not in text
+    assert [ name for name, _, _ in sections ] == [ "App_Fetch" ]
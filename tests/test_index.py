@@ -0,0 +1,33 @@
+"""The index procedures, which look rows up by a secondary index."""
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+import sgtables
+#pylint: enable=import-error
+
+from conftest import render
+
+
+def test_lookup_for_each_secondary_index(snapshot, script_options):
+    text, sections = render(snapshot, "Link", "index", script_options)
+
+    assert [ name for name, _, _ in sections ] == [ "App_By_note" ]
+    assert "CREATE PROCEDURE App_By_note (note VARCHAR(40))" in text
+    assert "WHERE l.note = note;" in text
+
+def test_no_lookup_without_secondary_indexes(snapshot, script_options):
+    text, sections = render(snapshot, "Person", "index", script_options)
+
+    assert sections == []
+    assert text == ""
+
+def test_details_are_read_only_when_needed(script_options):
+    def needed(script):
+        return [ argument for argument, _ in
+                 sgtables.get_needed_details(dict(script_options, script=script)) ]
+
+    assert needed("add") == []
+    assert needed("fetch") == [ "indexes", "children", "partitions" ]
+    assert needed("page") == [ "table_rows", "indexes", "partitions" ]
+    assert needed("all") == [ "indexes", "partitions" ]
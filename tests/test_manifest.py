@@ -0,0 +1,148 @@
+"""Skipping and regenerating the --output-dir scripts of tables."""
+
+import json
+import os
+import subprocess
+import sys
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error
+import sgmanifest
+#pylint: enable=import-error
+
+from conftest import DATABASE, TABLE_COLUMNS, write_snapshot
+
+SCHEMAGEN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "schemagen")
+
+
+def write_script(directory, name, text="script"):
+    """Write a script file for a Manifest to record."""
+    path = os.path.join(directory, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, mode="wt", encoding="utf-8") as script:
+        script.write(text)
+
+def test_fingerprint_follows_what_affects_the_code(script_options):
+    columns = [ dict(zip([ "COLUMN_NAME", "DATA_TYPE" ], row[:2]))
+                for row in TABLE_COLUMNS["Link"] ]
+    details = { "indexes": { "PRIMARY": [ "b_id", "a_id" ] } }
+    fingerprint = sgmanifest.table_fingerprint(columns, "App_", script_options, "table", details)
+
+    assert fingerprint == sgmanifest.table_fingerprint(columns, "App_", dict(script_options),
+                                                       "table", dict(details))
+    assert fingerprint != sgmanifest.table_fingerprint(columns[:2], "App_", script_options,
+                                                       "table", details)
+    assert fingerprint != sgmanifest.table_fingerprint(columns, "Link_", script_options,
+                                                       "table", details)
+    assert fingerprint != sgmanifest.table_fingerprint(columns, "App_",
+                                                       dict(script_options, delimiter="//"),
+                                                       "table", details)
+    assert fingerprint != sgmanifest.table_fingerprint(columns, "App_", script_options,
+                                                       "procedure", details)
+    reordered = { "indexes": { "PRIMARY": [ "a_id", "b_id" ] } }
+    assert fingerprint != sgmanifest.table_fingerprint(columns, "App_", script_options,
+                                                       "table", reordered)
+
+def test_manifest_records_current_tables(tmp_path):
+    directory = str(tmp_path / "out")
+    manifest = sgmanifest.Manifest(directory)
+    assert not manifest.is_current("Link", "1234")
+
+    write_script(directory, "Link.sql")
+    manifest.record_table("Link", "1234", [ "Link.sql" ])
+    manifest.save()
+
+    manifest = sgmanifest.Manifest(directory)
+    assert manifest.get_tables() == [ "Link" ]
+    assert manifest.is_current("Link", "1234")
+    assert not manifest.is_current("Link", "5678")
+
+    os.remove(os.path.join(directory, "Link.sql"))
+    assert not manifest.is_current("Link", "1234")
+
+def test_manifest_removes_files_no_longer_written(tmp_path):
+    directory = str(tmp_path)
+    manifest = sgmanifest.Manifest(directory)
+
+    for name in ("Link/App_List.sql", "Link/App_Page.sql"):
+        write_script(directory, name)
+    manifest.record_table("Link", "1234", [ "Link/App_List.sql", "Link/App_Page.sql" ])
+
+    manifest.record_table("Link", "5678", [ "Link/App_List.sql" ])
+    assert os.path.exists(os.path.join(directory, "Link/App_List.sql"))
+    assert not os.path.exists(os.path.join(directory, "Link/App_Page.sql"))
+
+    manifest.remove_table("Link")
+    assert manifest.get_tables() == []
+    assert not os.path.exists(os.path.join(directory, "Link"))
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    (tmp_path / sgmanifest.MANIFEST_NAME).write_text("{", encoding="utf-8")
+    assert sgmanifest.Manifest(str(tmp_path)).get_tables() == []
+
+
+def run_schemagen(directory, *arguments, script="all"):
+    """Run schemagen on the snapshot in `directory`, writing the `script`
+    procedures to its `out` subdirectory, and return the summary line
+    printed on stderr."""
+    result = subprocess.run([ sys.executable, SCHEMAGEN, "--from-snapshot", "snapshot.json",
+                              "-d", DATABASE, "-T", "-s", script, "-o", "out", *arguments ],
+                            cwd=directory, capture_output=True, text=True, check=True)
+    return result.stderr.strip().splitlines()[-1]
+
+def read_scripts(directory):
+    """Return relative path -> contents of the script files in `directory`."""
+    scripts = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.endswith(".sql"):
+                path = os.path.join(root, name)
+                with open(path, mode="rt", encoding="utf-8") as script:
+                    scripts[os.path.relpath(path, directory)] = script.read()
+    return scripts
+
+def test_output_dir_skips_unchanged_tables(tmp_path):
+    write_snapshot(tmp_path / "snapshot.json")
+
+    assert run_schemagen(tmp_path) == "4 of 4 table scripts written to out"
+    written = read_scripts(tmp_path / "out")
+    assert sorted(written) == [ "Link.sql", "Orders.sql", "Person.sql", "Phone.sql" ]
+
+    # The scripts, each headed by the time it was written, are left alone:
+    assert run_schemagen(tmp_path) == "0 of 4 table scripts written to out"
+    assert read_scripts(tmp_path / "out") == written
+
+    assert run_schemagen(tmp_path, "--force") == "4 of 4 table scripts written to out"
+
+def test_output_dir_regenerates_changed_tables(tmp_path):
+    write_snapshot(tmp_path / "snapshot.json")
+    run_schemagen(tmp_path)
+    written = read_scripts(tmp_path / "out")
+
+    table_columns = json.loads(json.dumps(TABLE_COLUMNS))
+    table_columns["Orders"].append([ "note", "varchar", 80, None, None, "YES", "",
+                                     "varchar(80)", "" ])
+    del table_columns["Phone"]
+    write_snapshot(tmp_path / "snapshot.json", table_columns)
+
+    assert run_schemagen(tmp_path) == "1 of 3 table scripts written to out"
+    rewritten = read_scripts(tmp_path / "out")
+    assert sorted(rewritten) == [ "Link.sql", "Orders.sql", "Person.sql" ]
+    assert "o.note" in rewritten["Orders.sql"]
+    assert rewritten["Link.sql"] == written["Link.sql"]
+
+def test_output_dir_follows_the_split(tmp_path):
+    write_snapshot(tmp_path / "snapshot.json")
+    run_schemagen(tmp_path, script="index")
+    assert sorted(read_scripts(tmp_path / "out")) == [ "Link.sql", "Orders.sql", "Person.sql",
+                                                       "Phone.sql" ]
+
+    # Person has no secondary index, so no procedure files:
+    assert (run_schemagen(tmp_path, "--split", "procedure", script="index")
+            == "4 of 4 table scripts written to out")
+    assert sorted(read_scripts(tmp_path / "out")) == [
+        os.path.join("Link", "App_Link_By_note.sql"),
+        os.path.join("Orders", "App_Orders_By_customer.sql"),
+        os.path.join("Phone", "App_Phone_By_person_id.sql") ]
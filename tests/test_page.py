@@ -0,0 +1,27 @@
+"""The page procedure, which reads a table a page at a time in key order."""
+
+from conftest import render
+
+
+def test_composite_page_seeks_with_or_terms(snapshot, script_options):
+    text, _ = render(snapshot, "Link", "page", script_options)
+
+    # The PRIMARY index orders the key columns, not the column order:
+    assert "CREATE PROCEDURE App_Page (after_b_id INT, after_a_id INT, page_size" in text
+    assert "IF after_b_id IS NULL AND after_a_id IS NULL THEN" in text
+    assert "ELSEIF after_b_id IS NULL OR after_a_id IS NULL THEN" in text
+    assert "'Incomplete page cursor'" in text
+    assert ("WHERE (l.b_id > after_b_id)\n"
+            "            OR (l.b_id = after_b_id AND l.a_id > after_a_id)\n") in text
+    assert text.count("ORDER BY l.b_id, l.a_id") == 2
+
+def test_single_key_page(snapshot, script_options):
+    text, _ = render(snapshot, "Person", "page", script_options)
+
+    assert "IF after_id IS NULL THEN" in text
+    assert "WHERE p.id > after_id" in text
+    assert "Incomplete page cursor" not in text
+
+def test_page_size_follows_the_estimated_rows(snapshot, script_options):
+    assert "SET page_size = 1000;" in render(snapshot, "Link", "page", script_options)[0]
+    assert "SET page_size = 500;" in render(snapshot, "Orders", "page", script_options)[0]
@@ -0,0 +1,27 @@
+"""Procedures of a partitioned table, which should prune its partitions."""
+
+from conftest import render
+
+
+def test_page_is_warned(snapshot, script_options):
+    text, _ = render(snapshot, "Orders", "page", script_options)
+
+    assert text.startswith("-- Warning: App_Page doesn't match the RANGE partition "
+                           "column(s) created of Orders")
+
+def test_key_procedures_are_not_warned(snapshot, script_options):
+    text, sections = render(snapshot, "Orders", "all", script_options)
+
+    assert "Warning" not in text
+    assert "App_Read" in [ name for name, _, _ in sections ]
+
+def test_index_lookup_takes_the_partition_columns(snapshot, script_options):
+    text, sections = render(snapshot, "Orders", "index", script_options)
+
+    assert [ name for name, _, _ in sections ] == [ "App_By_customer" ]
+    assert "CREATE PROCEDURE App_By_customer (customer INT NOT NULL, created DATE)" in text
+    assert "WHERE o.customer = customer\n       AND o.created = created;" in text
+    assert "Warning" not in text
+
+def test_unpartitioned_tables_are_not_warned(snapshot, script_options):
+    assert "Warning" not in render(snapshot, "Link", "page", script_options)[0]
@@ -0,0 +1,25 @@
+"""The upsert procedure, which inserts a row or updates the row with its key."""
+
+from conftest import render
+
+
+def test_upsert_returns_the_row(snapshot, script_options):
+    text, _ = render(snapshot, "Person", "upsert", script_options)
+
+    assert "ON DUPLICATE KEY UPDATE Person.id = LAST_INSERT_ID(Person.id)," in text
+    assert "SET id = LAST_INSERT_ID();" in text
+    assert "CALL App_List(id);" in text
+
+def test_composite_upsert_fills_in_the_autonumber(snapshot, script_options):
+    text, _ = render(snapshot, "Orders", "upsert", script_options)
+
+    assert "ON DUPLICATE KEY UPDATE Orders.id = LAST_INSERT_ID(Orders.id)," in text
+    assert "IF changed > 0 THEN" in text
+    assert "SET id = LAST_INSERT_ID();" in text
+    assert "CALL App_List(id, created);" in text
+
+def test_upsert_without_autonumber_calls_list_on_change(snapshot, script_options):
+    text, _ = render(snapshot, "Link", "upsert", script_options)
+
+    assert "LAST_INSERT_ID" not in text
+    assert "IF ROW_COUNT() > 0 THEN\n        CALL App_List(b_id, a_id);" in text
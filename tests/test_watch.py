@@ -0,0 +1,70 @@
+"""The table signatures that --watch compares to find changed tables,
+answered by the fake database of the benchmarks."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "bench"))
+
+# This non-error error is reported because we're not
+# in the same directory as the main source file.
+#pylint: disable=import-error,wrong-import-position
+import fakedb
+import sgdb
+import sgmodel
+#pylint: enable=import-error,wrong-import-position
+
+
+@pytest.fixture
+def database():
+    """Four synthetic tables, each but the first referring to the one before."""
+    return fakedb.make_database(4, 5)
+
+def get_signatures(database):
+    """Return the signatures of the tables, with the page size steps."""
+    return sgdb.get_table_signatures(fakedb.FakeConnection(database), "bench",
+                                     sgmodel.get_default_page_size)
+
+def get_changed(database, change):
+    """Return the names of the tables whose signature `change` changes."""
+    before = get_signatures(database)
+    change(database.schemas["bench"]["tables"])
+    after = get_signatures(database)
+    return sorted(table for table in after if before.get(table) != after[table])
+
+def test_unchanged_tables_keep_their_signatures(database):
+    assert get_changed(database, lambda tables: None) == []
+
+def test_columns_change_the_signature(database):
+    def add_column(tables):
+        tables["Table2"]["columns"].append(fakedb.make_column("extra", "int"))
+    assert get_changed(database, add_column) == [ "Table2" ]
+
+def test_partitioning_changes_the_signature(database):
+    def partition(tables):
+        tables["Table1"]["partitions"] = { "method": "HASH", "expression": "`id`" }
+    assert get_changed(database, partition) == [ "Table1" ]
+
+def test_referring_foreign_keys_change_the_signature(database):
+    def refer(tables):
+        tables["Table2"]["foreign_keys"].append({ "name": "fk_extra", "columns": [ "id" ],
+                                                  "referenced": [ "id" ],
+                                                  "referenced_table": "Table4" })
+    assert get_changed(database, refer) == [ "Table4" ]
+
+def test_only_page_size_steps_change_the_signature(database):
+    def grow(tables):
+        tables["Table3"]["table_rows"] = 900
+    assert get_changed(database, grow) == []
+
+    def grow_past_step(tables):
+        tables["Table3"]["table_rows"] = 2000
+    assert get_changed(database, grow_past_step) == [ "Table3" ]
+
+    connection = fakedb.FakeConnection(database)
+    assert (sgdb.get_table_signatures(connection, "bench")
+            == { table: signature.rsplit("/", 1)[0]
+                 for table, signature in get_signatures(database).items() })